@@ -0,0 +1,119 @@
+import sys
+from collections import namedtuple
+
+# 与 psutil 在 Linux 上返回的结构一致 ======================================
+scputimes = namedtuple("scputimes", "user nice system idle iowait irq softirq steal guest guest_nice")
+svmem = namedtuple("svmem", "total used")
+sdiskusage = namedtuple("sdiskusage", "total used")
+sdiskpart = namedtuple("sdiskpart", "device mountpoint fstype opts")
+snetio = namedtuple("snetio", "bytes_sent bytes_recv")
+snicstats = namedtuple("snicstats", "isup speed")
+
+
+class FakePsutil:
+    """离线 psutil：按录制的数据返回，advance() 推进一次计数器，
+    使 CPU 使用率及网卡速率走完整的增量计算路径"""
+    # 每次推进各核心增加的时间(1/100秒): user system idle iowait ===========
+    CPU_STEP = (30.0, 0.0, 10.0, 55.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    NET_STEP = 125000  # 每次推进每块网卡增加的字节数(按网卡序号倍增)
+
+    def __init__(self, fixture: dict):
+        data = fixture["psutil"]
+        self.cpu_base = [list(times) for times in data["cpu_percpu"]]
+        self.memory = svmem(*data["virtual_memory"])
+        self.usages = {path: sdiskusage(*value) for path, value in data["disk_usage"].items()}
+        self.partitions = [sdiskpart(*item) for item in data["disk_partitions"]]
+        self.net_base = data["net_io_counters"]
+        self.speeds = {name: snicstats(True, speed) for name, speed in data["net_if_stats"].items()}
+        self.statvfs = fixture.get("statvfs", {})
+        self.tick = 0
+
+    def advance(self):
+        self.tick += 1
+
+    # CPU ===================================================================
+    def cpu_times(self, percpu: bool = False):
+        cores = [scputimes(*[value + step * self.tick for value, step in zip(times, self.CPU_STEP)])
+                 for times in self.cpu_base]
+        if percpu:
+            return cores
+        return scputimes(*[sum(column) for column in zip(*cores)])
+
+    def cpu_count(self, logical: bool = True) -> int:
+        return len(self.cpu_base)
+
+    # 内存及磁盘 ============================================================
+    def virtual_memory(self):
+        return self.memory
+
+    def disk_usage(self, path: str):
+        if path in self.usages:
+            return self.usages[path]
+        total, used = self.statvfs.get(path, (0, 0))
+        return sdiskusage(total, used)
+
+    def disk_partitions(self, all: bool = False) -> list:
+        return list(self.partitions)
+
+    # 网卡 ==================================================================
+    def net_io_counters(self, pernic: bool = False, nowrap: bool = True):
+        step = self.NET_STEP * self.tick
+        counters = {name: snetio(sent + step * (index + 1), recv + step * (index + 2))
+                    for index, (name, (sent, recv)) in enumerate(self.net_base.items())}
+        if pernic:
+            return counters
+        return snetio(sum(item.bytes_sent for item in counters.values()),
+                      sum(item.bytes_recv for item in counters.values()))
+
+    def net_if_stats(self) -> dict:
+        return dict(self.speeds)
+
+
+class FakeNetifaces:
+    """离线 netifaces：按录制的接口地址及路由表返回"""
+    AF_INET = 2
+    AF_INET6 = 10
+    AF_LINK = 17
+
+    def __init__(self, fixture: dict):
+        data = fixture["netifaces"]
+        self.addresses = {name: {int(family): entries for family, entries in families.items()}
+                          for name, families in data["interfaces"].items()}
+        gateways = data["gateways"]
+        self.routes = {"default": {int(family): tuple(entry)
+                                   for family, entry in gateways.get("default", {}).items()}}
+        for family, entries in gateways.items():
+            if family != "default":
+                self.routes[int(family)] = [tuple(entry) for entry in entries]
+
+    def interfaces(self) -> list:
+        return list(self.addresses)
+
+    def ifaddresses(self, name: str) -> dict:
+        if name not in self.addresses:
+            raise ValueError("You must specify a valid interface name.")
+        return {family: [dict(entry) for entry in entries]
+                for family, entries in self.addresses[name].items()}
+
+    def gateways(self) -> dict:
+        return {family: (dict(entries) if family == "default" else list(entries))
+                for family, entries in self.routes.items()}
+
+
+def install(fixture: dict) -> tuple:
+    """在导入被测模块之前替换 psutil/netifaces，并屏蔽 NVML 及 py-cpuinfo，
+    保证基准测试不访问真实硬件；返回 (psutil, netifaces)"""
+    fake_psutil, fake_netifaces = FakePsutil(fixture), FakeNetifaces(fixture)
+    sys.modules["psutil"] = fake_psutil
+    sys.modules["netifaces"] = fake_netifaces
+    sys.modules["pynvml"] = None  # 导入时抛出 ImportError
+    sys.modules["cpuinfo"] = None
+    return fake_psutil, fake_netifaces
+
+
+def fake_gpu(fixture: dict):
+    """录制的 GPU 清单及采样，替代 NVML/nvidia-smi"""
+    from VMUploader.GPUStats import FakeBackend
+    data = fixture.get("gpus", {})
+    return FakeBackend(data.get("inventory", []),
+                       {int(gpu_id): value for gpu_id, value in data.get("sample", {}).items()})
@@ -0,0 +1,97 @@
+import os
+import json
+import shutil
+import tempfile
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Fixtures")
+PROC_FILES = ("stat", "meminfo", "net/dev", "self/mountinfo")
+
+
+# 读取录制数据 ==============================================================
+def load(name: str) -> dict:
+    """按名称(Fixtures/<名称>.json)或路径读取录制的主机数据"""
+    path = name if os.path.isfile(name) else os.path.join(FIXTURES, name + ".json")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ProcTree:
+    """把录制的 /proc 文本展开为临时目录，供 ProcRead(root) 及挂载表回放"""
+
+    def __init__(self, fixture: dict):
+        self.root = tempfile.mkdtemp(prefix="bm-proc-")
+        for name, text in fixture["proc"].items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    @property
+    def mountinfo(self) -> str:
+        return os.path.join(self.root, "self", "mountinfo")
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+# 录制本机 ==================================================================
+def record(name: str) -> dict:
+    """录制本机的 /proc、psutil、netifaces 及 GPU 数据，需安装真实依赖"""
+    import psutil
+    import netifaces as ni
+    from VMUploader.GPUStats import GPUStats
+
+    proc = {}
+    for item in PROC_FILES:
+        try:
+            with open(os.path.join("/proc", item), "r", encoding="utf-8") as f:
+                proc[item] = f.read()
+        except OSError:
+            pass
+    partitions = psutil.disk_partitions(all=False)
+    statvfs = {}
+    for disk in partitions:
+        try:
+            usage = psutil.disk_usage(disk.mountpoint)
+            statvfs[disk.mountpoint] = [usage.total, usage.used]
+        except OSError:
+            continue
+    gateways = ni.gateways()
+    gpu_stats = GPUStats()
+    return {
+        "name": name,
+        "proc": proc,
+        "psutil": {
+            "cpu_percpu": [list(times)[:10] + [0.0] * (10 - len(times))
+                           for times in psutil.cpu_times(percpu=True)],
+            "virtual_memory": [psutil.virtual_memory().total, psutil.virtual_memory().used],
+            "disk_usage": {"/": list(psutil.disk_usage("/")[:2])},
+            "disk_partitions": [[disk.device, disk.mountpoint, disk.fstype, disk.opts]
+                                for disk in partitions],
+            "net_io_counters": {nic: [data.bytes_sent, data.bytes_recv]
+                                for nic, data in psutil.net_io_counters(pernic=True).items()},
+            "net_if_stats": {nic: stats.speed for nic, stats in psutil.net_if_stats().items()},
+        },
+        "statvfs": statvfs,
+        "netifaces": {
+            "interfaces": {nic: {str(family): entries for family, entries in ni.ifaddresses(nic).items()}
+                           for nic in ni.interfaces()},
+            "gateways": {str(family) if family != "default" else family:
+                         ({str(key): list(value) for key, value in entries.items()}
+                          if family == "default" else [list(entry) for entry in entries])
+                         for family, entries in gateways.items()},
+        },
+        "gpus": {"inventory": gpu_stats.rescan(),
+                 "sample": {str(gpu_id): value for gpu_id, value in gpu_stats.sample().items()}},
+    }
+
+
+if __name__ == "__main__":
+    # 录制本机数据: python -m Benchmark.BMFixture <名称>
+    import sys
+
+    fixture_name = sys.argv[1] if len(sys.argv) > 1 else "local"
+    fixture_path = os.path.join(FIXTURES, fixture_name + ".json")
+    with open(fixture_path, "w", encoding="utf-8") as out:
+        json.dump(record(fixture_name), out, indent=1)
+    print("已录制:", fixture_path)
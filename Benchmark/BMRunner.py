@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import itertools
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource，峰值RSS记为0
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 回归阈值: 指标 -> (允许增长比例, 绝对余量)，余量避免极小值的抖动误报；
+# 子进程峰值RSS含解释器及依赖的导入开销，随环境变化较大，只显示不作为门限 ====
+LIMITS = {"median_us": (0.30, 2.0), "alloc_peak_kb": (0.10, 4.0)}
+
+
+class BMCase:
+    """单个基准项：setup(录制数据, 假后端) 返回被测的无参函数"""
+
+    def __init__(self, name: str, fixture: str, setup, iterations: int = 200):
+        self.name = name
+        self.fixture = fixture  # 录制数据名称(Fixtures/<名称>.json)
+        self.setup = setup
+        self.iterations = iterations  # 计时调用次数
+
+
+CASES: dict = {}  # 名称 -> BMCase
+
+
+def case(name: str, fixture: str, iterations: int = 200):
+    def wrapper(setup):
+        CASES[name] = BMCase(name, fixture, setup, iterations)
+        return setup
+    return wrapper
+
+
+# 基准项 ====================================================================
+def build_status(backend: str, fixture: dict, fakes: tuple):
+    """proc 后端回放录制的 /proc 目录，psutil 后端使用假 psutil；GPU 及 statvfs 使用录制值"""
+    from Benchmark.BMFakes import fake_gpu
+    from Benchmark.BMFixture import ProcTree
+    from VMUploader.GPUStats import GPUStats
+    from VMUploader.HDDMount import HDDMount
+    from VMUploader.VMStatus import VMStatus
+
+    GPUStats.detect = staticmethod(lambda: fake_gpu(fixture))
+    tree = ProcTree(fixture)
+    atexit.register(tree.close)
+    vm_status = VMStatus(backend=backend, root=tree.root)
+    hdd_mount, statvfs = vm_status.hdd_mount, fixture.get("statvfs", {})
+    hdd_mount.MOUNT_INFO = tree.mountinfo if backend == "proc" else os.path.join(tree.root, "none")
+    hdd_mount.measure = lambda mount: [int(value / HDDMount.MBYTES) for value in statvfs.get(mount, (0, 0))]
+    return vm_status
+
+
+def status_case(backend: str):
+    def setup(fixture: dict, fakes: tuple):
+        vm_status, psutil = build_status(backend, fixture, fakes), fakes[0]
+
+        def run():
+            psutil.advance()  # 推进计数器，走完整的速率计算
+            vm_status.status()
+        return run
+    return setup
+
+
+case("status.proc.small", "small")(status_case("proc"))
+case("status.proc.large", "large")(status_case("proc"))
+case("status.psutil.large", "large")(status_case("psutil"))
+
+
+@case("hwstatus.dict.large", "large", iterations=2000)
+def hwstatus_dict(fixture: dict, fakes: tuple):
+    """HWStatus 转换为上报字典(64块网卡、200个挂载点、8块GPU)"""
+    vm_status = build_status("proc", fixture, fakes)
+    fakes[0].advance()
+    vm_status.status()
+    fakes[0].advance()
+    vm_status.status()  # 第二轮才有各网卡速率
+    return vm_status.__dict__
+
+
+@case("ncmanage.get_nic.large", "large", iterations=500)
+def ncmanage_get_nic(fixture: dict, fakes: tuple):
+    """单次遍历64块网卡的地址及网关"""
+    from NICManager.NCManage import NCManage
+    return NCManage().get_nic
+
+
+@case("ncconfig.send_mac", "large", iterations=5000)
+def ncconfig_send_mac(fixture: dict, fakes: tuple):
+    """按IPv4地址生成MAC，依次轮换录制的各网卡地址"""
+    from NICManager.NCConfig import NCConfig
+    configs = itertools.cycle([NCConfig(mac_addr="-", ip4_addr=families["2"][0]["addr"])
+                               for families in fixture["netifaces"]["interfaces"].values()
+                               if "2" in families])
+    return lambda: next(configs).send_mac()
+
+
+# 单项测量(子进程内) ========================================================
+def peak_rss() -> float:
+    """进程峰值RSS(MB)，Linux 单位为KB，macOS 为字节"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def measure(bm_case: BMCase, iterations: int = None) -> dict:
+    from loguru import logger
+    from Benchmark.BMFakes import install
+    from Benchmark.BMFixture import load
+
+    logger.remove()  # 日志输出不计入耗时
+    fixture = load(bm_case.fixture)
+    run = bm_case.setup(fixture, install(fixture))
+    iterations = iterations or bm_case.iterations
+    for _ in range(max(3, iterations // 10)):  # 预热，静态采集项在此完成
+        run()
+    # 耗时 ==================================================================
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    # 内存分配(单次调用的临时峰值及调用后仍保留的字节) ======================
+    peaks, kept = [], []
+    for _ in range(5):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - before)
+        kept.append(current - before)
+    return {"iterations": iterations,
+            "min_us": round(samples[0], 2),
+            "median_us": round(statistics.median(samples), 2),
+            "p95_us": round(samples[int(len(samples) * 0.95) - 1], 2),
+            "alloc_peak_kb": round(statistics.median(peaks) / 1024, 2),
+            "alloc_kept_b": int(statistics.median(kept)),
+            "rss_mb": peak_rss()}
+
+
+# 对比基线 ==================================================================
+def compare(result: dict, baseline: dict, tolerance: float = 1.0) -> list:
+    """返回超出阈值的指标: [(指标, 基线值, 当前值)]"""
+    failed = []
+    for metric, (ratio, slack) in LIMITS.items():
+        if metric not in baseline:
+            continue
+        allowed = baseline[metric] * (1 + ratio * tolerance) + slack * tolerance
+        if result[metric] > allowed:
+            failed.append((metric, baseline[metric], result[metric]))
+    return failed
+
+
+def spawn(name: str, iterations: int = None) -> dict:
+    """每项在独立子进程中运行，峰值RSS及假后端互不影响"""
+    command = [sys.executable, "-m", "Benchmark.BMRunner", "--child", name]
+    if iterations:
+        command += ["--iterations", str(iterations)]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"退出码 {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="离线基准测试：采集、序列化及网卡发现")
+    parser.add_argument("cases", nargs="*", help="只运行指定的基准项(默认全部)")
+    parser.add_argument("--baseline", default=BASELINE, help="基线文件路径")
+    parser.add_argument("--update", action="store_true", help="以本次结果覆盖基线")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="阈值倍数，机器噪声大时调高")
+    parser.add_argument("--iterations", type=int, default=None, help="覆盖各项的计时调用次数")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(measure(CASES[args.child], args.iterations)))
+        return 0
+
+    names = args.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error("未知的基准项: " + ", ".join(unknown))
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("python") != platform.python_version() or baseline.get("machine") != platform.machine():
+            print(f"[基线] 基线来自 Python {baseline.get('python')} / {baseline.get('machine')}，"
+                  f"当前为 Python {platform.python_version()} / {platform.machine()}，结果仅供参考")
+    elif not args.update:
+        print(f"[基线] 未找到 {args.baseline}，使用 --update 生成")
+
+    results, failures = {}, 0
+    print(f"{'基准项':<26}{'中位us':>10}{'P95us':>10}{'分配KB':>10}{'保留B':>8}{'RSS MB':>9}  对比基线")
+    for name in names:
+        try:
+            result = spawn(name, args.iterations)
+        except (RuntimeError, ValueError) as e:
+            print(f"{name:<26}运行失败: {e}")
+            failures += 1
+            continue
+        results[name] = result
+        base = baseline.get("results", {}).get(name)
+        note = "无基线"
+        if base:
+            failed = compare(result, base, args.tolerance)
+            failures += bool(failed) and not args.update
+            note = "; ".join(f"{metric} {old} -> {new}" for metric, old, new in failed) or \
+                   f"{(result['median_us'] / base['median_us'] - 1) * 100:+.1f}%"
+            note = ("回归: " if failed else "") + note
+        print(f"{name:<26}{result['median_us']:>10}{result['p95_us']:>10}{result['alloc_peak_kb']:>10}"
+              f"{result['alloc_kept_b']:>8}{result['rss_mb']:>9}  {note}")
+
+    if args.update:
+        stored = dict(baseline.get("results", {}), **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": stored}, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"[基线] 已更新 {args.baseline}")
+        return 0
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    # 运行: python -m Benchmark.BMRunner [基准项...] [--update] [--tolerance 2]
+    sys.exit(main())
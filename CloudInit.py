@@ -1,289 +1,135 @@
 import os
-import time
+import math
 import platform
-import requests
-import subprocess
 
 from loguru import logger
 from NICManager.NCManage import NCManage
+from OSManager.OSConfig import OSConfig
+from OSManager.OSHosts import OSHosts
+from OSManager.OSRecord import OSRecord
+from VMUploader.VMAgents import VMAgents
+from VMUploader.VMClient import VMClient
+from VMUploader.VMDeltas import VMDeltas
+from VMUploader.VMMetric import VMMetric
+from VMUploader.VMNotify import VMNotify
+from VMUploader.VMReport import VMReport
+from VMUploader.VMSpools import VMSpools
 from VMUploader.VMStatus import VMStatus
+from VMUploader.VMTracer import tracer
 
 
 class Cloudinit:
-    def __init__(self):
-        self.vm_status = VMStatus()
+    def __init__(self, delta: bool = False, binary: bool = False, backend: str = "auto",
+                 spool: bool = True, interval: float = 60.0, sample_rate: float = 1.0,
+                 batch_size: int = 1, flush_interval: float = None, push: bool = True,
+                 metrics: bool = True, trace: bool = False):
+        # 高频采样窗口覆盖整个采集周期 ====================================
+        self.vm_status = VMStatus(ring_size=max(1, math.ceil(interval * sample_rate)), backend=backend)
+        self.vm_client = VMClient()  # 与控制器通信共用的长连接客户端
+        self.vm_rate = sample_rate  # 高频采样频率(Hz)，0 为不采样
+        self.vm_interval = interval  # 采集周期(秒)
+        self.vm_batch = batch_size  # 每批样本数，大于1时多份样本合并上报
+        self.vm_flush = flush_interval  # 批量上报周期(秒)
+        self.vm_report = VMReport(self.vm_client, VMDeltas() if delta else None,
+                                  binary=binary, limit=8.0,
+                                  spool=VMSpools() if spool else None)
+        self.vm_notify = VMNotify(self.vm_report) if push else None  # 配置推送(长轮询)
+        self.vm_metric = VMMetric(  # 本机指标接口，供监控/计费进程读取缓存
+            socket_path="/run/openidcs/agent.sock" if platform.system().lower() == "linux" else None,
+            window=self.vm_status.window) if metrics else None
+        self.vm_trace = trace  # 是否随上报附带代理自身耗时统计
+        self.vm_record = OSRecord()  # 已应用配置的指纹
+        self.vm_system = OSConfig()  # 主机名及密码(进程内设置)
+        self.vm_hosts = OSHosts()  # hosts 文件(变化时原子写入)
         self.vm_config = {
             "hs_name": "",
             "vm_uuid": "",
             "vm_pass": "",
         }
-        self.network_u = 0
-        self.network_d = 0
-        self.flu_usage = 0
 
     def server(self):
-        time_last = 0
-        nets_apis = NCManage()
-        nets_apis.get_nic()
-        nets_list = nets_apis.nic_list
-        while True:  # 每60秒上报一次 ===========================================
-            time.sleep(1)
-            time_data = time.time()
-            if time_data - time_last > 60:
-                self.vm_status.status()
-                # 获取增量带宽 ==================================================
-                last_network_u = self.network_u
-                last_network_d = self.network_d
-                last_flu_usage = self.flu_usage
-                print("[原始带宽上行]", last_network_u)
-                print("[原始带宽下行]", last_network_d)
-                print("[原始流量消耗]", last_flu_usage)
-                self.network_u = self.vm_status.vm_status.network_d
-                self.network_d = self.vm_status.vm_status.network_u
-                self.flu_usage = self.vm_status.vm_status.flu_usage
-                self.vm_status.vm_status.network_d = self.network_d - last_network_d
-                self.vm_status.vm_status.network_u = self.network_u - last_network_u
-                self.vm_status.vm_status.flu_usage = self.flu_usage - last_flu_usage
-                print("[增量带宽上行]", self.vm_status.vm_status.network_d)
-                print("[增量带宽下行]", self.vm_status.vm_status.network_u)
-                print("[增量流量消耗]", self.vm_status.vm_status.flu_usage)
-                vm_status = self.vm_status.__dict__()
-                for nic_name in nets_list:
-                    nic_gate = nets_list[nic_name].ip4_gate
-                    if nic_gate == "" or not nic_gate.endswith(".1"):
-                        continue
-                    if nets_list[nic_name].mac_addr == "00:00:00:00:00:00":
-                        continue
-                    nic_gate = ".".join(nic_gate.split(".")[:-1]) + ".2"
-                    url_post = f"http://{nic_gate}:1880/api/client/upload"
-                    url_post += f"?nic={nets_list[nic_name].mac_addr}"
-
-                    try:  # 上报虚拟机状态 ====================================
-                        logger.info("[上报虚拟机状态地址] {}", url_post)
-                        logger.debug("[上报虚拟机状态数据] {}", vm_status)
-                        vm_result = requests.post(url=url_post, json=vm_status, timeout=5)
-                        logger.info("[上报虚拟机状态结果] {}", vm_result.status_code)
-                        if vm_result.status_code == 200:
-                            logger.info("[上报虚拟机状态成功]")
-                            vm_data = vm_result.json()['data']
-                            if not vm_data:
-                                continue
-                            self.vm_config["vm_uuid"] = vm_data["vm_uuid"]
-                            self.vm_config["vm_pass"] = vm_data["vm_pass"]
-                            self.manage()
-                    except requests.exceptions.ConnectionError as e:
-                        logger.error("[上报虚拟机状态异常]", e)
-                        continue
-                    except requests.exceptions.Timeout as e:
-                        logger.error("[上报虚拟机状态异常]", e)
-                        continue
-                    except Exception as e:
-                        logger.error("[上报虚拟机状态异常] {}", e)
-                time_last = time_data
-
+        self.nets_apis = NCManage(watch=True)
+        self.nets_apis.subscribe(self.vm_report.retarget)  # 网卡或网关变化时更新上报地址
+        self.vm_report.retarget(self.nets_apis.nic_list)
+        if self.vm_metric is not None:
+            self.vm_metric.start()
+        VMAgents(self.collect, self.report, self.apply, interval=self.vm_interval,
+                 sample=self.vm_status.sample, sample_rate=self.vm_rate,
+                 probe=self.vm_report.probe,
+                 batch_size=self.vm_batch, flush_interval=self.vm_flush,
+                 listen=self.vm_notify.run if self.vm_notify else None,
+                 spool=self.vm_report.spool.push if self.vm_report.spool else None).start()
+
+    # 采集状态 ==============================================================
+    def collect(self) -> dict:
+        """采集虚拟机状态，带宽与流量已由 VMStatus 按真实间隔换算为本窗口增量"""
+        self.vm_status.status()
+        logger.info("[本轮带宽上行] {} Mbps", self.vm_status.vm_status.network_u)
+        logger.info("[本轮带宽下行] {} Mbps", self.vm_status.vm_status.network_d)
+        logger.info("[本轮流量消耗] {} MB", self.vm_status.vm_status.flu_usage)
+        if self.vm_trace:
+            self.vm_status.vm_status.col_trace = tracer.summary()
+        vm_status = self.vm_status.__dict__()
+        if self.vm_metric is not None:
+            self.vm_metric.update(vm_status)
+        return vm_status
+
+    # 上报状态 ==============================================================
+    def report(self, vm_status, deliver=None):
+        """vm_status 为单份状态字典，或批量模式下的 [(生成时间, 状态字典)]"""
+        if isinstance(vm_status, list):
+            return self.vm_report.upload_batch(vm_status, self.vm_report.url_list, deliver)
+        return self.vm_report.upload(vm_status, self.vm_report.url_list, deliver)
+
+    # 应用配置 ==============================================================
+    def apply(self, vm_data: dict):
+        self.vm_config["vm_uuid"] = vm_data["vm_uuid"]
+        self.vm_config["vm_pass"] = vm_data["vm_pass"]
+        self.manage()
+
+    @tracer.timed("manage")
     def manage(self):
-        """管理虚拟机配置，设置主机名和管理员密码"""
+        """管理虚拟机配置，设置主机名和管理员密码；
+        各步骤输入未变化时直接跳过，整体未变化时不执行任何系统命令"""
         if not self.vm_config.get("vm_uuid") or not self.vm_config.get("vm_pass"):
             logger.warning("[管理虚拟机配置] 虚拟机UUID或密码为空，跳过配置")
             return
 
         vm_uuid = self.vm_config["vm_uuid"]
         vm_pass = self.vm_config["vm_pass"]
+        if not self.vm_record.changed("manage", vm_uuid, vm_pass):
+            logger.debug("[管理虚拟机配置] 配置未变化，跳过")
+            return
 
         # 检测操作系统类型
         system = platform.system().lower()
-        logger.info("[管理虚拟机配置] 检测到操作系统: {}", system)
-
-        try:
-            if system == "linux":
-                logger.info("[Linux配置] 开始设置Linux系统配置")
-
-                # 设置主机名
-                logger.info("[Linux主机名] 设置主机名为: {}", vm_uuid)
-
-                # 获取当前主机名
-                current_hostname_result = subprocess.run(["hostname"], capture_output=True, text=True)
-                current_hostname = current_hostname_result.stdout.strip()
-
-                if current_hostname == vm_uuid:
-                    logger.info("[Linux主机名] 当前主机名已经是: {}，无需修改", vm_uuid)
-                else:
-                    logger.info("[Linux主机名] 当前主机名: {}，需要修改为: {}", current_hostname, vm_uuid)
-                    result = subprocess.run(["sudo", "hostnamectl", "set-hostname", vm_uuid], capture_output=True,
-                                            text=True)
-                    if result.returncode == 0:
-                        logger.info("[Linux主机名] 主机名设置成功: {}", vm_uuid)
-                    else:
-                        # 备用方式
-                        with open("/etc/hostname", "w") as f:
-                            f.write(vm_uuid + "\n")
-                        subprocess.run(["sudo", "hostname", vm_uuid], check=True)
-                        logger.info("[Linux主机名] 传统方式设置成功: {}", vm_uuid)
-
-                # 设置root密码
-                logger.info("[Linux密码] 设置root密码")
-                process = subprocess.Popen(["sudo", "chpasswd"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                                           stderr=subprocess.PIPE, text=True)
-                stdout, stderr = process.communicate(input=f"root:{vm_pass}")
-                if process.returncode == 0:
-                    logger.info("[Linux密码] root密码设置成功")
-                else:
-                    logger.error("[Linux密码] 设置失败: {}", stderr)
-
-                # 设置user密码（与root相同）
-                logger.info("[Linux密码] 设置user密码")
-                process = subprocess.Popen(["sudo", "chpasswd"], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                                           stderr=subprocess.PIPE, text=True)
-                stdout, stderr = process.communicate(input=f"user:{vm_pass}")
-                if process.returncode == 0:
-                    logger.info("[Linux密码] user密码设置成功")
-                else:
-                    logger.error("[Linux密码] user设置失败: {}", stderr)
-
-                # 更新 hosts 文件
-                logger.info("[Linux hosts] 更新 hosts 文件")
-                self._update_hosts_linux(vm_uuid)
-
-                logger.info("[Linux配置] Linux系统配置完成")
-
-            elif system == "windows":
-                logger.info("[Windows配置] 开始设置Windows系统配置")
-
-                # 设置主机名
-                logger.info("[Windows主机名] 设置主机名为: {}", vm_uuid)
-
-                # 获取当前主机名
-                current_hostname_result = subprocess.run(["hostname"], capture_output=True, text=True, shell=True)
-                current_hostname = current_hostname_result.stdout.strip()
-
-                if current_hostname.lower() == vm_uuid.lower():
-                    logger.info("[Windows主机名] 当前主机名已经是: {}，无需修改", vm_uuid)
-                else:
-                    logger.info("[Windows主机名] 当前主机名: {}，需要修改为: {}", current_hostname, vm_uuid)
-                    result = subprocess.run(
-                        ["wmic", "computersystem", "where", "name='%computername%'", "rename", vm_uuid],
-                        capture_output=True, text=True, shell=True)
-                    if result.returncode == 0:
-                        logger.info("[Windows主机名] 主机名设置成功，需要重启后生效: {}", vm_uuid)
-                    else:
-                        logger.error("[Windows主机名] 设置失败: {}", result.stderr)
-
-                # 设置administrator密码
-                logger.info("[Windows密码] 设置administrator密码")
-                result = subprocess.run(["net", "user", "administrator", vm_pass], capture_output=True, text=True)
-                print(" ".join(["net", "user", "administrator", vm_pass]))
-                print(result.stdout)
-                if result.returncode == 0:
-                    logger.info("[Windows密码] administrator密码设置成功")
-                else:
-                    logger.error("[Windows密码] 设置失败: {}", result.stderr)
-
-                # 更新 hosts 文件
-                logger.info("[Windows hosts] 更新 hosts 文件")
-                self._update_hosts_windows(vm_uuid)
-
-                logger.info("[Windows配置] Windows系统配置完成")
+        if system not in ("linux", "windows"):
+            logger.warning("[管理虚拟机配置] 不支持的操作系统: {}", system)
+            return
+        logger.info("[管理虚拟机配置] 开始设置 {} 系统配置", system)
+        steps = [("hostname", self.vm_system.set_hostname, vm_uuid),
+                 ("password", self.vm_system.set_password, vm_pass),
+                 ("hosts", self.vm_hosts.update, vm_uuid)]
+
+        # 只执行输入变化的步骤，成功后记录指纹 ==============================
+        finished = True
+        for step, func, *values in steps:
+            if not self.vm_record.changed(step, *values):
+                logger.info("[管理虚拟机配置] {} 未变化，跳过", step)
+                continue
+            try:
+                with tracer.span("manage." + step):
+                    success = func(*values)
+            except Exception as e:
+                logger.error("[管理虚拟机配置] {} 配置失败: {}", step, e)
+                success = False
+            if success:
+                self.vm_record.commit(step, *values)
             else:
-                logger.warning("[管理虚拟机配置] 不支持的操作系统: {}", system)
-
-        except Exception as e:
-            logger.error("[管理虚拟机配置] 配置失败: {}", e)
-
-    def _update_hosts_linux(self, hostname):
-        """更新 Linux hosts 文件"""
-        try:
-            hosts_path = "/etc/hosts"
-            hosts_entry = f"127.0.0.1\t{hostname}\n"
-
-            # 读取当前 hosts 文件内容
-            with open(hosts_path, "r") as f:
-                lines = f.readlines()
-
-            # 查找是否已存在该主机的映射
-            found = False
-            new_lines = []
-            for line in lines:
-                stripped = line.strip()
-                if stripped and not stripped.startswith("#"):
-                    parts = stripped.split()
-                    if len(parts) >= 2 and parts[1] == hostname:
-                        # 更新现有条目
-                        new_lines.append(hosts_entry)
-                        found = True
-                    else:
-                        new_lines.append(line)
-                else:
-                    new_lines.append(line)
-
-            # 如果没有找到，添加新条目（在 localhost 条目之后）
-            if not found:
-                for i, line in enumerate(new_lines):
-                    stripped = line.strip()
-                    if stripped and "127.0.0.1" in stripped and "localhost" in stripped:
-                        new_lines.insert(i + 1, hosts_entry)
-                        break
-                else:
-                    # 如果找不到 localhost 条目，直接添加到文件末尾
-                    new_lines.append(hosts_entry)
-
-            # 写回文件
-            with open(hosts_path, "w") as f:
-                f.writelines(new_lines)
-
-            logger.info("[Linux hosts] hosts 文件更新成功")
-
-        except IOError as e:
-            logger.error("[Linux hosts] 读取或写入 hosts 文件失败: {}", e)
-        except Exception as e:
-            logger.error("[Linux hosts] 更新 hosts 文件异常: {}", e)
-
-    def _update_hosts_windows(self, hostname):
-        """更新 Windows hosts 文件"""
-        try:
-            hosts_path = r"C:\Windows\System32\drivers\etc\hosts"
-            hosts_entry = f"127.0.0.1\t{hostname}\n"
-
-            # 读取当前 hosts 文件内容
-            with open(hosts_path, "r") as f:
-                lines = f.readlines()
-
-            # 查找是否已存在该主机的映射
-            found = False
-            new_lines = []
-            for line in lines:
-                stripped = line.strip()
-                if stripped and not stripped.startswith("#"):
-                    parts = stripped.split()
-                    if len(parts) >= 2 and parts[1].lower() == hostname.lower():
-                        # 更新现有条目
-                        new_lines.append(hosts_entry)
-                        found = True
-                    else:
-                        new_lines.append(line)
-                else:
-                    new_lines.append(line)
-
-            # 如果没有找到，添加新条目（在 localhost 条目之后）
-            if not found:
-                for i, line in enumerate(new_lines):
-                    stripped = line.strip()
-                    if stripped and "127.0.0.1" in stripped and "localhost" in stripped.lower():
-                        new_lines.insert(i + 1, hosts_entry)
-                        break
-                else:
-                    # 如果找不到 localhost 条目，直接添加到文件末尾
-                    new_lines.append(hosts_entry)
-
-            # 写回文件
-            with open(hosts_path, "w") as f:
-                f.writelines(new_lines)
-
-            logger.info("[Windows hosts] hosts 文件更新成功")
-
-        except IOError as e:
-            logger.error("[Windows hosts] 读取或写入 hosts 文件失败: {}", e)
-        except Exception as e:
-            logger.error("[Windows hosts] 更新 hosts 文件异常: {}", e)
+                finished = False
+        if finished:
+            self.vm_record.commit("manage", vm_uuid, vm_pass)
+            logger.info("[管理虚拟机配置] 系统配置完成")
 
     def extend(self):
         system = platform.system().lower()
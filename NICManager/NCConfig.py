@@ -1,28 +1,27 @@
-class NCConfig:
-    def __init__(self, **kwargs):
-        self.mac_addr: str = ""
-        self.nic_type: str = ""
-        self.ip4_addr: str = ""
-        self.ip6_addr: str = ""
-        self.ip4_gate: str = ""
-        self.ip6_gate: str = ""
-        self.__load__(**kwargs)
+from VMUploader.VMSchema import VMField, VMSchema
 
+
+class NCConfig(metaclass=VMSchema):
+    FIELDS = (
+        VMField("mac_addr", "str", ""),
+        VMField("nic_type", "str", ""),
+        VMField("ip4_addr", "str", ""),
+        VMField("ip6_addr", "str", ""),
+        VMField("ip4_gate", "str", ""),
+        VMField("ip6_gate", "str", ""),
+    )
+
+    def __init__(self, config=None, /, **kwargs):
+        self.__fill__(config, **kwargs)
+        if self.mac_addr == "":
+            self.mac_addr = self.send_mac()
+
+    # 兼容旧接口 ===============================
     def __dict__(self):
-        return {
-            "mac_addr": self.mac_addr,
-            "nic_type": self.nic_type,
-            "ip4_addr": self.ip4_addr,
-            "ip6_addr": self.ip6_addr,
-            "ip4_gate": self.ip4_gate,
-            "ip6_gate": self.ip6_gate,
-        }
+        return self.to_dict()
 
-    # 加载数据 ===============================
     def __load__(self, **kwargs):
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        self.update(kwargs)
         if self.mac_addr == "":
             self.mac_addr = self.send_mac()
 
@@ -0,0 +1,109 @@
+import errno
+import select
+import socket
+import struct
+
+
+class NCEvents:
+    """rtnetlink 订阅：链路/地址/路由变化时返回受影响的网卡，仅 Linux 可用"""
+    # 订阅组 ================================================================
+    RTMGRP_LINK = 0x1
+    RTMGRP_IPV4_IFADDR = 0x10
+    RTMGRP_IPV4_ROUTE = 0x40
+    RTMGRP_IPV6_IFADDR = 0x100
+    RTMGRP_IPV6_ROUTE = 0x400
+    # 消息类型 ==============================================================
+    NLMSG_ERROR = 2
+    RTM_LINKS = (16, 17)  # RTM_NEWLINK, RTM_DELLINK
+    RTM_ADDRS = (20, 21)  # RTM_NEWADDR, RTM_DELADDR
+    RTM_ROUTES = (24, 25)  # RTM_NEWROUTE, RTM_DELROUTE
+    IFLA_IFNAME = 3
+    NLMSG_HEAD = struct.Struct("=IHHII")  # 长度 类型 标志 序号 端口
+    IFINFO = struct.Struct("=BxHiII")  # 协议族 类型 索引 标志 变化掩码
+    IFADDR = struct.Struct("=BBBBI")  # 协议族 前缀 标志 范围 索引
+    RTATTR = struct.Struct("=HH")  # 长度 类型
+
+    def __init__(self, size: int = 65536):
+        self.size = size
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        self.sock.bind((0, self.RTMGRP_LINK | self.RTMGRP_IPV4_IFADDR | self.RTMGRP_IPV6_IFADDR
+                        | self.RTMGRP_IPV4_ROUTE | self.RTMGRP_IPV6_ROUTE))
+        self.sock.setblocking(False)
+        self.names = {index: name for index, name in socket.if_nameindex()}  # 索引 -> 网卡名
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(socket, "AF_NETLINK") and hasattr(socket, "NETLINK_ROUTE")
+
+    # 索引转名称 ============================================================
+    def name_of(self, index: int) -> str:
+        """已删除的网卡无法再查询，使用缓存的名称"""
+        try:
+            self.names[index] = socket.if_indextoname(index)
+        except OSError:
+            pass
+        return self.names.get(index, "")
+
+    # 解析消息 ==============================================================
+    def parse(self, data: bytes, names: set) -> bool:
+        """把受影响的网卡名加入 names，返回是否包含路由变化"""
+        routes, offset = False, 0
+        while offset + self.NLMSG_HEAD.size <= len(data):
+            length, kind = self.NLMSG_HEAD.unpack_from(data, offset)[:2]
+            if length < self.NLMSG_HEAD.size:
+                break
+            body = offset + self.NLMSG_HEAD.size
+            if kind in self.RTM_LINKS:
+                index = self.IFINFO.unpack_from(data, body)[2]
+                name = self.link_name(data, body + self.IFINFO.size, offset + length)
+                if name:
+                    self.names[index] = name
+                names.add(name or self.name_of(index))
+                if kind == self.RTM_LINKS[1]:
+                    self.names.pop(index, None)
+            elif kind in self.RTM_ADDRS:
+                names.add(self.name_of(self.IFADDR.unpack_from(data, body)[4]))
+            elif kind in self.RTM_ROUTES:
+                routes = True
+            offset += (length + 3) & ~3
+        names.discard("")
+        return routes
+
+    def link_name(self, data: bytes, offset: int, end: int) -> str:
+        """从 RTM_NEWLINK/DELLINK 的属性中取出 IFLA_IFNAME"""
+        while offset + self.RTATTR.size <= end:
+            length, kind = self.RTATTR.unpack_from(data, offset)
+            if length < self.RTATTR.size:
+                break
+            if kind == self.IFLA_IFNAME:
+                return data[offset + self.RTATTR.size:offset + length].split(b"\0", 1)[0].decode()
+            offset += (length + 3) & ~3
+        return ""
+
+    # 等待事件 ==============================================================
+    def wait(self, timeout: float = None, settle: float = 0.5):
+        """阻塞到有事件，合并 settle 秒内的后续事件；
+        返回 (网卡名集合, 是否路由变化)，超时返回 None，内核缓冲溢出时网卡名集合为 None"""
+        if not select.select([self.sock], [], [], timeout)[0]:
+            return None
+        names, routes = set(), False
+        while True:
+            try:
+                routes |= self.parse(self.sock.recv(self.size), names)
+            except BlockingIOError:
+                if not select.select([self.sock], [], [], settle)[0]:
+                    return names, routes
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                return None, True  # 丢失了事件，需要全量刷新
+
+    def close(self):
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    # 打印网卡变化事件: python -m NICManager.NCEvents
+    events = NCEvents()
+    while True:
+        print(events.wait())
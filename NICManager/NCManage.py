@@ -1,102 +1,174 @@
+import time
+import threading
 import netifaces as ni
 from loguru import logger
 from NICManager.NCConfig import NCConfig
+from NICManager.NCEvents import NCEvents
+from VMUploader.VMTracer import tracer
 
 
 class NCManage:
-    def __init__(self):
+    def __init__(self, watch: bool = False, interval: float = 60.0):
         self.nic_list: dict[str, NCConfig] = {}
+        self.gateways: tuple = ({}, {}, None, None)  # IPv4映射, IPv6映射, IPv4默认, IPv6默认
+        self.listeners: list = []  # 上报地址变化时的回调: (nic_list) -> None
+        self.interval = interval  # 无 netlink 时的轮询周期(秒)
+        self.lock = threading.Lock()
+        self.thread = None
         self.get_nic()
+        if watch:
+            self.watch()
 
-
-    # 获取所有网络接口 ##################################################
-    def get_nic(self):
-        self.nic_list = {}
-
-        # 获取默认网关信息
+    # 获取网关信息 ######################################################
+    def get_gateways(self) -> tuple:
         gateways_info = ni.gateways()
         default_ipv4_gateway = gateways_info.get('default', {}).get(ni.AF_INET, (None, None))[0]
         default_ipv6_gateway = gateways_info.get('default', {}).get(ni.AF_INET6, (None, None))[0]
 
-        # 获取每个接口的网关信息
-        ipv4_gateways = gateways_info.get(ni.AF_INET, [])
-        ipv6_gateways = gateways_info.get(ni.AF_INET6, [])
-
         # 创建网关映射字典 {接口名: 网关IP}
-        ipv4_gateway_map = {gateway[1]: gateway[0] for gateway in ipv4_gateways}
-        ipv6_gateway_map = {gateway[1]: gateway[0] for gateway in ipv6_gateways}
-
-        # 使用集合来避免重复处理
-        processed_interfaces = set()
-
-        for nic_data in ni.interfaces():
-            nic_key = nic_data.lower()
-
-            # 避免重复处理同一个接口
-            if nic_key in processed_interfaces:
-                continue
+        ipv4_gateway_map = {gateway[1]: gateway[0] for gateway in gateways_info.get(ni.AF_INET, [])}
+        ipv6_gateway_map = {gateway[1]: gateway[0] for gateway in gateways_info.get(ni.AF_INET6, [])}
+        self.gateways = (ipv4_gateway_map, ipv6_gateway_map, default_ipv4_gateway, default_ipv6_gateway)
+        return self.gateways
+
+    def get_gate(self, nic_data: str) -> tuple:
+        """返回接口的 (IPv4网关, IPv6网关)，接口没有特定网关时使用默认网关"""
+        ipv4_gateway_map, ipv6_gateway_map, default_ipv4_gateway, default_ipv6_gateway = self.gateways
+        ip4_gate = ipv4_gateway_map.get(nic_data, '') or default_ipv4_gateway or ''
+        ip6_gate = ipv6_gateway_map.get(nic_data, '') or default_ipv6_gateway or ''
+        return ip4_gate, ip6_gate
+
+    # 读取单个网络接口 ##################################################
+    def get_one(self, nic_data: str):
+        """每个接口只调用一次 ifaddresses，无效或已消失的接口返回 None"""
+        try:
+            addresses = ni.ifaddresses(nic_data)
+            # 获取MAC地址
+            mac = addresses[ni.AF_LINK][0]['addr']
+            if mac == '00:00:00:00:00:00':  # 排除无效MAC地址
+                return None
+            if mac == '':
+                mac = '00:00:00:00:00:00'
+            # 获取IPv4地址信息
+            ip4_info = addresses.get(ni.AF_INET, [{}])
+            ip4_addr = ip4_info[0].get('addr', '') if ip4_info and ip4_info[0] else ''
+            # 获取IPv6地址信息
+            ip6_info = addresses.get(ni.AF_INET6, [{}])
+            ip6_addr = ip6_info[0].get('addr', '') if ip6_info and ip6_info[0] else ''
+            ip4_gate, ip6_gate = self.get_gate(nic_data)
+            return NCConfig(
+                mac_addr=mac,
+                nic_type=nic_data,
+                ip4_addr=ip4_addr,
+                ip6_addr=ip6_addr,
+                ip4_gate=ip4_gate,
+                ip6_gate=ip6_gate
+            )
+        except ValueError:  # 接口已被移除
+            return None
+        except (KeyError, IndexError) as e:
+            logger.error("Error getting info for interface {}: {}", nic_data, e)
+            return None
 
-            try:
-                # 获取MAC地址
-                mac = ni.ifaddresses(nic_data)[ni.AF_LINK][0]['addr']
-                if mac == '00:00:00:00:00:00':  # 排除无效MAC地址
-                    processed_interfaces.add(nic_key)
+    # 获取所有网络接口 ##################################################
+    def get_nic(self):
+        """单次遍历：网关读取一次，每个接口读取一次"""
+        with self.lock, tracer.span("nic.enumerate"):
+            self.get_gateways()
+            nic_list = {}
+            for nic_data in ni.interfaces():
+                nic_key = nic_data.lower()
+                if nic_key in nic_list:  # 避免重复处理同一个接口
                     continue
-
-                if mac == '':
-                    mac = '00:00:00:00:00:00'
-                # 获取IPv4地址信息
-                ip4_info = ni.ifaddresses(nic_data).get(ni.AF_INET, [{}])
-                ip4_addr = ip4_info[0].get('addr', '') if ip4_info and ip4_info[0] else ''
-
-                # 获取IPv6地址信息
-                ip6_info = ni.ifaddresses(nic_data).get(ni.AF_INET6, [{}])
-                ip6_addr = ip6_info[0].get('addr', '') if ip6_info and ip6_info[0] else ''
-
-                # 获取IPv4网关
-                ip4_gate = ipv4_gateway_map.get(nic_data, '')
-                if not ip4_gate and default_ipv4_gateway:
-                    # 如果接口没有特定网关，使用默认网关
-                    ip4_gate = default_ipv4_gateway
-
-                # 获取IPv6网关
-                ip6_gate = ipv6_gateway_map.get(nic_data, '')
-                if not ip6_gate and default_ipv6_gateway:
-                    # 如果接口没有特定网关，使用默认网关
-                    ip6_gate = default_ipv6_gateway
-
-                # 创建NCConfig对象
-                nic_config = NCConfig(
-                    mac_addr=mac,
-                    nic_type=nic_data,
-                    ip4_addr=ip4_addr,
-                    ip6_addr=ip6_addr,
-                    ip4_gate=ip4_gate,
-                    ip6_gate=ip6_gate
-                )
-
-                # 将网卡配置添加到字典中
-                self.nic_list[nic_key] = nic_config
-                processed_interfaces.add(nic_key)
+                nic_config = self.get_one(nic_data)
+                if nic_config is not None:
+                    nic_list[nic_key] = nic_config
+            self.update(nic_list)
+
+    # 增量刷新 ##########################################################
+    def refresh(self, names=None, routes: bool = False):
+        """只重新读取受影响的接口；路由变化时只重算网关，不重复读取地址"""
+        if names is None:
+            return self.get_nic()
+        with self.lock, tracer.span("nic.refresh"):
+            nic_list = dict(self.nic_list)
+            if routes:
+                self.get_gateways()
+                for nic_key, nic_config in nic_list.items():
+                    ip4_gate, ip6_gate = self.get_gate(nic_config.nic_type)
+                    if (ip4_gate, ip6_gate) != (nic_config.ip4_gate, nic_config.ip6_gate):
+                        nic_list[nic_key] = NCConfig(nic_config.to_dict(), ip4_gate=ip4_gate, ip6_gate=ip6_gate)
+            for nic_data in names:
+                nic_config = self.get_one(nic_data)
+                if nic_config is None:
+                    nic_list.pop(nic_data.lower(), None)
+                else:
+                    nic_list[nic_data.lower()] = nic_config
+            self.update(nic_list)
+
+    # 替换网卡列表 ######################################################
+    def update(self, nic_list: dict):
+        """整体替换 nic_list(其他线程读取到的总是完整列表)，上报地址相关字段变化时通知订阅者"""
+        old_list, self.nic_list = self.nic_list, nic_list
+        for nic_key, nic_config in nic_list.items():
+            if old_list.get(nic_key) != nic_config:
                 logger.info(
-                    "Interface {}: MAC={}, IPv4={}, IPv6={}, IPv4_GW={}, IPv6_GW={}", 
-                    nic_data, mac, ip4_addr, ip6_addr, ip4_gate, ip6_gate)
-
-            except (KeyError, IndexError) as e:
-                logger.error("Error getting info for interface {}: {}", nic_data, e)
-                processed_interfaces.add(nic_key)
-                continue
+                    "Interface {}: MAC={}, IPv4={}, IPv6={}, IPv4_GW={}, IPv6_GW={}",
+                    nic_config.nic_type, nic_config.mac_addr, nic_config.ip4_addr,
+                    nic_config.ip6_addr, nic_config.ip4_gate, nic_config.ip6_gate)
+        for nic_key in old_list.keys() - nic_list.keys():
+            logger.info("Interface {} removed", old_list[nic_key].nic_type)
+        if self.endpoints(old_list) != self.endpoints(nic_list):
+            for callback in self.listeners:
+                try:
+                    callback(nic_list)
+                except Exception as e:
+                    logger.error("[网卡变化通知] {}", e)
+
+    @staticmethod
+    def endpoints(nic_list: dict) -> set:
+        return {(config.mac_addr, config.ip4_gate) for config in nic_list.values()}
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    # 监听网卡变化 ######################################################
+    def watch(self):
+        """后台线程：优先订阅 rtnetlink 事件，不可用时按周期单次遍历轮询"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.__watch__, name="nic-watch", daemon=True)
+            self.thread.start()
+
+    def __watch__(self):
+        events = None
+        if NCEvents.available():
+            try:
+                events = NCEvents()
+                self.get_nic()  # 订阅前发生的变化
+            except OSError as e:
+                logger.warning("[网卡监听] rtnetlink 不可用，改为轮询: {}", e)
+        while True:
+            try:
+                if events is None:
+                    time.sleep(self.interval)
+                    self.get_nic()
+                    continue
+                changes = events.wait()
+                if changes is not None:
+                    self.refresh(*changes)
+            except Exception as e:
+                logger.error("[网卡监听] {}", e)
+                time.sleep(self.interval)
 
     def get_nic_info(self):
         """
         返回格式化的网卡信息
         """
-        return {name: config.__dict__() for name, config in self.nic_list.items()}
+        return {name: config.to_dict() for name, config in self.nic_list.items()}
 
 
 if __name__ == "__main__":
     service = NCManage()
-    service.get_nic()
 
     print("\n=== NCConfig格式的网卡信息 ===")
     nic_info = service.get_nic_info()
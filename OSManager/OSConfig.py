@@ -0,0 +1,119 @@
+import os
+import socket
+import ctypes
+import platform
+import subprocess
+from loguru import logger
+from OSManager.OSWriter import OSWriter
+
+try:
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:  # jeepney 为可选依赖，缺失时直接调用 sethostname
+    open_dbus_connection = None
+
+
+class OSConfig:
+    """系统配置：进程内读取/设置主机名及密码，尽量不创建子进程
+    Linux 主机名优先通过 D-Bus 交给 systemd-hostnamed，否则 sethostname(2) 并写 /etc/hostname；
+    Windows 主机名及密码直接调用 Win32 API"""
+    HOSTNAME_FILE = "/etc/hostname"
+    USERS = {"linux": ("root", "user"), "windows": ("administrator",)}
+
+    def __init__(self, system: str = None):
+        self.system = system or platform.system().lower()
+
+    # 主机名 ================================================================
+    @staticmethod
+    def get_hostname() -> str:
+        return socket.gethostname()
+
+    def get_static(self) -> str:
+        """Linux 持久化的主机名，重启后生效的值"""
+        try:
+            with open(self.HOSTNAME_FILE, "r") as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    def set_hostname(self, hostname: str) -> bool:
+        if self.system == "windows":
+            return self.__hostname_windows__(hostname)
+        if self.get_hostname() == hostname and self.get_static() == hostname:
+            logger.info("[系统主机名] 当前主机名已经是: {}，无需修改", hostname)
+            return True
+        logger.info("[系统主机名] 当前主机名: {}，需要修改为: {}", self.get_hostname(), hostname)
+        if open_dbus_connection is not None and self.__hostname_dbus__(hostname):
+            return True
+        return self.__hostname_kernel__(hostname)
+
+    def __hostname_dbus__(self, hostname: str) -> bool:
+        """由 systemd-hostnamed 同时设置运行时及静态主机名"""
+        address = DBusAddress("/org/freedesktop/hostname1", bus_name="org.freedesktop.hostname1",
+                              interface="org.freedesktop.hostname1")
+        try:
+            with open_dbus_connection(bus="SYSTEM") as conn:
+                for method in ("SetStaticHostname", "SetHostname"):
+                    unwrap_msg(conn.send_and_get_reply(
+                        new_method_call(address, method, "sb", (hostname, False)), timeout=5.0))
+            logger.info("[系统主机名] 已通过 hostnamed 设置: {}", hostname)
+            return True
+        except Exception as e:
+            logger.warning("[系统主机名] hostnamed 不可用，改为直接设置: {}", e)
+            return False
+
+    def __hostname_kernel__(self, hostname: str) -> bool:
+        """sethostname(2) 设置运行时主机名，并写入 /etc/hostname 持久化"""
+        name = hostname.encode("utf-8")
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.sethostname(name, len(name)) != 0:
+            logger.error("[系统主机名] sethostname 失败: {}", os.strerror(ctypes.get_errno()))
+            return False
+        OSWriter.write(self.HOSTNAME_FILE, hostname + "\n")
+        logger.info("[系统主机名] 主机名设置成功: {}", hostname)
+        return True
+
+    def __hostname_windows__(self, hostname: str) -> bool:
+        """SetComputerNameExW(ComputerNamePhysicalDnsHostname)，重启后生效"""
+        if self.get_hostname().lower() == hostname.lower():
+            logger.info("[系统主机名] 当前主机名已经是: {}，无需修改", hostname)
+            return True
+        if not ctypes.windll.kernel32.SetComputerNameExW(5, hostname):
+            logger.error("[系统主机名] 设置失败: {}", ctypes.FormatError())
+            return False
+        logger.info("[系统主机名] 主机名设置成功，需要重启后生效: {}", hostname)
+        return True
+
+    # 密码 ==================================================================
+    def set_password(self, password: str, users: tuple = None) -> bool:
+        users = users or self.USERS.get(self.system, ())
+        if self.system == "windows":
+            return all([self.__password_windows__(user, password) for user in users])
+        return self.__password_linux__(users, password)
+
+    @staticmethod
+    def __password_linux__(users: tuple, password: str) -> bool:
+        """一次 chpasswd 设置全部用户，已是 root 时不再经过 sudo"""
+        command = ["chpasswd"] if os.geteuid() == 0 else ["sudo", "chpasswd"]
+        result = subprocess.run(command, input="".join(f"{user}:{password}\n" for user in users),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error("[系统密码] 设置失败: {}", result.stderr.strip())
+            return False
+        logger.info("[系统密码] {} 密码设置成功", ",".join(users))
+        return True
+
+    @staticmethod
+    def __password_windows__(user: str, password: str) -> bool:
+        """NetUserSetInfo(level=1003) 直接修改本地账户密码"""
+        class USER_INFO_1003(ctypes.Structure):
+            _fields_ = [("usri1003_password", ctypes.c_wchar_p)]
+
+        info = USER_INFO_1003(password)
+        status = ctypes.windll.netapi32.NetUserSetInfo(None, user, 1003, ctypes.byref(info), None)
+        if status != 0:
+            logger.error("[系统密码] {} 设置失败，错误码 {}", user, status)
+            return False
+        logger.info("[系统密码] {} 密码设置成功", user)
+        return True
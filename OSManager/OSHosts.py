@@ -0,0 +1,97 @@
+import os
+import platform
+from loguru import logger
+from OSManager.OSWriter import OSWriter
+
+
+class OSHosts:
+    """hosts 文件编辑：解析为 主机名 -> 行号 索引，只改动需要变化的行，
+    内容不变时不写文件；Linux 与 Windows 共用同一套逻辑"""
+    LINUX_PATH = "/etc/hosts"
+    WINDOWS_PATH = r"C:\Windows\System32\drivers\etc\hosts"
+
+    def __init__(self, path: str = None, system: str = None):
+        system = system or platform.system().lower()
+        self.path = path or (self.WINDOWS_PATH if system == "windows" else self.LINUX_PATH)
+        self.folded = system == "windows"  # Windows 主机名不区分大小写
+        self.lines: list = []
+        self.index: dict = {}  # 主机名 -> [行号]
+
+    def key(self, hostname: str) -> str:
+        return hostname.lower() if self.folded else hostname
+
+    # 解析 ==================================================================
+    def load(self):
+        text = OSWriter.read(self.path) or ""
+        self.lines = text.splitlines(keepends=True)
+        if self.lines and not self.lines[-1].endswith("\n"):
+            self.lines[-1] += "\n"
+        self.reindex()
+
+    def reindex(self):
+        self.index = {}
+        for number, line in enumerate(self.lines):
+            for name in line.split("#", 1)[0].split()[1:]:  # 第一列为地址，其后为主机名及别名
+                self.index.setdefault(self.key(name), []).append(number)
+
+    # 设置映射 ==============================================================
+    def ensure(self, address: str, hostname: str) -> bool:
+        """保证 hostname 解析到 address，返回内容是否变化(调用 save 写入)"""
+        entry = f"{address}\t{hostname}\n"
+        numbers = [number for number in self.index.get(self.key(hostname), [])
+                   if len(self.lines[number].split()) >= 2
+                   and self.key(self.lines[number].split()[1]) == self.key(hostname)]
+        if numbers:
+            changed = False
+            for number in numbers:  # 主机名为首个名称的条目，地址不同时替换整行
+                if self.lines[number].split()[0] != address:
+                    self.lines[number] = entry
+                    changed = True
+            return changed
+        if any(self.lines[number].split()[0] == address
+               for number in self.index.get(self.key(hostname), [])):
+            return False  # 已作为别名存在
+        # 新增条目：放在 localhost 条目之后，没有时追加到末尾 ==============
+        for number in self.index.get("localhost", []):
+            if self.lines[number].split()[0] == "127.0.0.1":
+                self.lines.insert(number + 1, entry)
+                break
+        else:
+            self.lines.append(entry)
+        self.reindex()
+        return True
+
+    # 写入 ==================================================================
+    def save(self) -> bool:
+        return OSWriter.write(self.path, "".join(self.lines))
+
+    def update(self, hostname: str, address: str = "127.0.0.1") -> bool:
+        """重新读取 hosts，设置本机主机名映射，内容变化时原子写入；返回是否成功"""
+        try:
+            self.load()
+            if self.ensure(address, hostname) and self.save():
+                logger.info("[系统hosts] hosts 文件更新成功: {} -> {}", hostname, address)
+            else:
+                logger.info("[系统hosts] hosts 已包含 {}，无需修改", hostname)
+            return True
+        except OSError as e:
+            logger.error("[系统hosts] 读取或写入 hosts 文件失败: {}", e)
+            return False
+
+
+if __name__ == "__main__":
+    # 自检: python -m OSManager.OSHosts
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "hosts")
+    with open(path, "w") as f:
+        f.write("# comment\n127.0.0.1\tlocalhost\n::1\tlocalhost ip6-localhost\n")
+    hosts = OSHosts(path, system="linux")
+    assert hosts.update("vm-1")
+    assert open(path).read().splitlines()[2] == "127.0.0.1\tvm-1"
+    before = os.stat(path).st_mtime_ns
+    hosts.update("vm-1")
+    assert os.stat(path).st_mtime_ns == before  # 未变化不写入
+    hosts.update("vm-1", "127.0.1.1")
+    assert open(path).read().count("vm-1") == 1 and "127.0.1.1\tvm-1" in open(path).read()
+    print("OSHosts OK")
@@ -0,0 +1,75 @@
+import os
+import json
+import hmac
+import hashlib
+import platform
+import threading
+from loguru import logger
+from OSManager.OSWriter import OSWriter
+
+
+class OSRecord:
+    """已应用配置指纹：每个配置步骤的输入取带密钥的摘要并持久化，
+    输入未变化的步骤直接跳过，重启后同样生效；文件中不保存明文密码"""
+
+    def __init__(self, path: str = None):
+        self.path = path or self.default_path()
+        self.lock = threading.Lock()
+        self.steps: dict = {}  # 步骤名 -> 输入摘要
+        self.key = b""  # 本机随机密钥，防止摘要被直接比对
+        self.load()
+
+    # 默认路径 ==============================================================
+    @staticmethod
+    def default_path() -> str:
+        if platform.system().lower() == "windows":
+            base = os.path.join(os.environ.get("ProgramData", "C:\\ProgramData"), "OpenIDCS")
+        else:
+            base = "/var/lib/openidcs"
+        return os.path.join(base, "applied.json")
+
+    # 读取记录 ==============================================================
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.key = bytes.fromhex(data.get("key", ""))
+            self.steps = dict(data.get("steps", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("[配置指纹] 读取 {} 失败，全部步骤将重新执行: {}", self.path, e)
+        if not self.key:
+            self.key = os.urandom(16)
+            self.steps = {}
+
+    def save(self):
+        """原子替换，仅 root/管理员可读"""
+        data = json.dumps({"key": self.key.hex(), "steps": self.steps}, indent=1)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            OSWriter.write(self.path, data, mode=0o600)
+        except OSError as e:
+            logger.warning("[配置指纹] 保存 {} 失败: {}", self.path, e)
+
+    # 摘要 ==================================================================
+    def digest(self, *values) -> str:
+        text = json.dumps(values, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return hmac.new(self.key, text, hashlib.sha256).hexdigest()
+
+    # 判断及记录 ============================================================
+    def changed(self, step: str, *values) -> bool:
+        with self.lock:
+            return self.steps.get(step) != self.digest(*values)
+
+    def commit(self, step: str, *values):
+        with self.lock:
+            self.steps[step] = self.digest(*values)
+            self.save()
+
+    def forget(self, *steps):
+        """使指定(或全部)步骤下次重新执行"""
+        with self.lock:
+            for step in steps or list(self.steps):
+                self.steps.pop(step, None)
+            self.save()
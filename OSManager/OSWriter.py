@@ -0,0 +1,75 @@
+import os
+import tempfile
+from loguru import logger
+from VMUploader.VMTracer import tracer
+
+
+class OSWriter:
+    """原子写入配置文件：内容未变化时不写，变化时写临时文件、fsync 后 rename 替换，
+    中途崩溃不会留下截断的文件，也不会无谓地唤醒 inotify 监听者"""
+
+    # 读取 ==================================================================
+    @staticmethod
+    def read(path: str, encoding: str = "utf-8"):
+        """返回文件文本，不存在时返回 None"""
+        try:
+            with open(path, "r", encoding=encoding, errors="surrogateescape") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # 写入 ==================================================================
+    @classmethod
+    def write(cls, path: str, content: str, mode: int = None, encoding: str = "utf-8") -> bool:
+        """内容变化时原子替换 path，返回是否写入；保留原文件的权限及属主，
+        新文件使用 mode(默认 0644)"""
+        if cls.read(path, encoding) == content:
+            tracer.count("file.unchanged")
+            return False
+        with tracer.span("file.write"):
+            cls.replace(path, content, mode, encoding)
+        logger.debug("[配置文件] 已更新: {}", path)
+        return True
+
+    @classmethod
+    def replace(cls, path: str, content: str, mode: int, encoding: str):
+        """写临时文件、fsync 后 rename 替换"""
+        folder = os.path.dirname(os.path.abspath(path))
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        handle, temp = tempfile.mkstemp(dir=folder, prefix="." + os.path.basename(path) + ".")
+        try:
+            with open(handle, "w", encoding=encoding, errors="surrogateescape") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            if stat is not None:
+                os.chmod(temp, stat.st_mode & 0o7777)
+                if hasattr(os, "chown"):
+                    try:
+                        os.chown(temp, stat.st_uid, stat.st_gid)
+                    except PermissionError:
+                        pass
+            else:
+                os.chmod(temp, mode if mode is not None else 0o644)
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+            raise
+        cls.sync_dir(folder)
+
+    @staticmethod
+    def sync_dir(folder: str):
+        """rename 本身落盘需要同步目录，Windows 不支持打开目录，跳过"""
+        if os.name != "posix":
+            return
+        handle = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(handle)
+        finally:
+            os.close(handle)
@@ -0,0 +1,82 @@
+import array
+import threading
+import psutil
+
+
+class CPUStats:
+    """非阻塞CPU采样器：保存上一次的累计时间，按两次调用之间的真实窗口计算使用率"""
+    MODES = ("user", "system", "iowait", "steal")
+    PROC_MODES = {"user": 0, "system": 2, "iowait": 4, "steal": 7}  # /proc/stat 中的列号
+
+    def __init__(self, reader=None):
+        self.lock = threading.Lock()
+        self.reader = reader  # ProcRead 直读后端，None 时使用 psutil
+        self.usage: float = 0.0  # 窗口内总使用率(%)
+        self.cores: list = []  # 窗口内每个核心使用率(%)
+        self.modes: dict = {mode: 0.0 for mode in self.MODES}  # 窗口内各模式占比(%)
+        if reader is not None:
+            self.last_array = array.array("Q", reader.read_stat())
+        else:
+            self.last_total = psutil.cpu_times()
+            self.last_cores = psutil.cpu_times(percpu=True)
+
+    # 累计时间 ==============================================================
+    @staticmethod
+    def __time__(times) -> tuple:
+        """返回 (总时间, 空闲时间)，guest 时间已计入 user，需扣除避免重复"""
+        total = sum(times)
+        total -= getattr(times, "guest", 0.0) + getattr(times, "guest_nice", 0.0)
+        idle = times.idle + getattr(times, "iowait", 0.0)
+        return total, idle
+
+    # 窗口使用率 ============================================================
+    @classmethod
+    def __busy__(cls, last, curr) -> float:
+        last_all, last_idle = cls.__time__(last)
+        curr_all, curr_idle = cls.__time__(curr)
+        delta = curr_all - last_all
+        if delta <= 0:
+            return 0.0
+        busy = delta - (curr_idle - last_idle)
+        return min(100.0, max(0.0, busy / delta * 100))
+
+    # 直读采样 ============================================================
+    def __proc__(self) -> float:
+        """基于 ProcRead 数组计算，每行前8列为非 guest 时间，第3/4列为 idle/iowait"""
+        curr, last = self.reader.read_stat(), self.last_array
+        if len(curr) != len(last):  # CPU 热插拔，重新建立基线
+            self.last_array = array.array("Q", curr)
+            return self.usage
+        width, usages, delta = self.reader.CPU_FIELDS, [], 0
+        for base in range(0, len(curr), width):
+            delta_all = sum(curr[base:base + 8]) - sum(last[base:base + 8])
+            delta_idle = curr[base + 3] + curr[base + 4] - last[base + 3] - last[base + 4]
+            if base == 0:
+                delta = delta_all
+            usages.append(min(100.0, max(0.0, (delta_all - delta_idle) / delta_all * 100))
+                          if delta_all > 0 else 0.0)
+        for mode, index in self.PROC_MODES.items():
+            self.modes[mode] = max(0.0, (curr[index] - last[index]) / delta * 100) if delta > 0 else 0.0
+        last[:] = curr
+        self.usage, self.cores = usages[0], usages[1:]
+        return self.usage
+
+    # 采样 ==================================================================
+    def sample(self) -> float:
+        """计算自上次采样以来的使用率，不阻塞"""
+        if self.reader is not None:
+            with self.lock:
+                return self.__proc__()
+        curr_total = psutil.cpu_times()
+        curr_cores = psutil.cpu_times(percpu=True)
+        with self.lock:
+            self.usage = self.__busy__(self.last_total, curr_total)
+            self.cores = [self.__busy__(last, curr)
+                          for last, curr in zip(self.last_cores, curr_cores)]
+            delta = self.__time__(curr_total)[0] - self.__time__(self.last_total)[0]
+            for mode in self.MODES:
+                spent = getattr(curr_total, mode, 0.0) - getattr(self.last_total, mode, 0.0)
+                self.modes[mode] = max(0.0, spent / delta * 100) if delta > 0 else 0.0
+            self.last_total = curr_total
+            self.last_cores = curr_cores
+            return self.usage
@@ -0,0 +1,155 @@
+import shutil
+import subprocess
+from loguru import logger
+
+try:
+    import pynvml
+except ImportError:  # NVML 为可选依赖
+    pynvml = None
+
+
+class GPUBackend:
+    """GPU采集后端接口，默认实现即无GPU主机的空后端"""
+    name = "none"
+
+    def inventory(self) -> list:
+        """静态清单: [{"id", "name", "uuid", "memory_total"}]，启动时读取一次"""
+        return []
+
+    def sample(self) -> dict:
+        """动态数据: {id: [使用率%, 已用显存MB, 温度℃]}"""
+        return {}
+
+    def close(self):
+        pass
+
+
+class NVMLBackend(GPUBackend):
+    """常驻 NVML 句柄，无需每轮 fork nvidia-smi"""
+    name = "nvml"
+
+    def __init__(self):
+        pynvml.nvmlInit()
+        self.handles = [pynvml.nvmlDeviceGetHandleByIndex(index)
+                        for index in range(pynvml.nvmlDeviceGetCount())]
+
+    @staticmethod
+    def text(value) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def inventory(self) -> list:
+        return [{"id": index,
+                 "name": self.text(pynvml.nvmlDeviceGetName(handle)),
+                 "uuid": self.text(pynvml.nvmlDeviceGetUUID(handle)),
+                 "memory_total": int(pynvml.nvmlDeviceGetMemoryInfo(handle).total / (1024 * 1024))}
+                for index, handle in enumerate(self.handles)]
+
+    def sample(self) -> dict:
+        result = {}
+        for index, handle in enumerate(self.handles):
+            rates = pynvml.nvmlDeviceGetUtilizationRates(handle)
+            memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+            heats = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+            result[index] = [int(rates.gpu), int(memory.used / (1024 * 1024)), int(heats)]
+        return result
+
+    def close(self):
+        pynvml.nvmlShutdown()
+
+
+class SMIBackend(GPUBackend):
+    """调用 nvidia-smi 的兜底后端，带超时，驱动卡死时不拖住代理"""
+    name = "nvidia-smi"
+
+    def __init__(self, timeout: float = 5.0, command: str = "nvidia-smi"):
+        self.timeout = timeout
+        self.command = command
+
+    def query(self, fields: str) -> list:
+        result = subprocess.run(
+            [self.command, f"--query-gpu={fields}", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, timeout=self.timeout, check=True)
+        return [[item.strip() for item in line.split(",")]
+                for line in result.stdout.splitlines() if line.strip()]
+
+    @staticmethod
+    def number(text: str) -> int:
+        try:
+            return int(float(text))
+        except ValueError:  # [N/A] 等不可用字段
+            return 0
+
+    def inventory(self) -> list:
+        return [{"id": int(row[0]), "name": row[1], "uuid": row[2],
+                 "memory_total": self.number(row[3])}
+                for row in self.query("index,name,uuid,memory.total")]
+
+    def sample(self) -> dict:
+        return {int(row[0]): [self.number(row[1]), self.number(row[2]), self.number(row[3])]
+                for row in self.query("index,utilization.gpu,memory.used,temperature.gpu")}
+
+
+class FakeBackend(GPUBackend):
+    """测试用后端，返回预设数据"""
+    name = "fake"
+
+    def __init__(self, gpus: list = None, samples: dict = None):
+        self.gpus = gpus or []
+        self.samples = samples or {}
+
+    def inventory(self) -> list:
+        return list(self.gpus)
+
+    def sample(self) -> dict:
+        return dict(self.samples)
+
+
+class GPUStats:
+    """GPU采集：启动时探测后端并缓存静态清单，每轮只刷新使用率/显存/温度"""
+
+    def __init__(self, backend: GPUBackend = None):
+        self.backend = backend if backend is not None else self.detect()
+        self.gpus: list = []  # 静态清单(缓存)
+        self.stats: dict = {}  # {id: [使用率%, 已用显存MB, 温度℃]}
+        self.stale = False  # 本轮刷新失败，沿用旧值
+
+    # 探测后端 ==============================================================
+    @staticmethod
+    def detect() -> GPUBackend:
+        if pynvml is not None:
+            try:
+                backend = NVMLBackend()
+                if backend.handles:
+                    return backend
+                backend.close()
+            except Exception as e:
+                logger.debug("[GPU采集] NVML 不可用: {}", e)
+        if shutil.which("nvidia-smi"):
+            backend = SMIBackend()
+            try:
+                if backend.inventory():
+                    return backend
+            except Exception as e:
+                logger.warning("[GPU采集] nvidia-smi 不可用: {}", e)
+        return GPUBackend()
+
+    # 重新读取清单(启动或热插拔时) ==========================================
+    def rescan(self) -> list:
+        try:
+            self.gpus = self.backend.inventory()
+        except Exception as e:
+            logger.error("[GPU采集] 读取GPU清单失败: {}", e)
+        logger.info("[GPU采集] 使用 {} 后端，检测到 {} 块GPU", self.backend.name, len(self.gpus))
+        return self.gpus
+
+    # 刷新动态数据 ==========================================================
+    def sample(self) -> dict:
+        if not self.gpus:
+            return self.stats
+        try:
+            self.stats = self.backend.sample()
+            self.stale = False
+        except Exception as e:
+            self.stale = True
+            logger.warning("[GPU采集] 刷新失败，沿用旧值: {}", e)
+        return self.stats
@@ -0,0 +1,151 @@
+import os
+import re
+import time
+import select
+import psutil
+import concurrent.futures
+from loguru import logger
+
+
+class HDDMount:
+    """挂载点清单：挂载表变化时才重新读取，过滤伪文件系统，statvfs 单独超时"""
+    # 伪文件系统(始终跳过) =================================================
+    PSEUDO_FS = frozenset((
+        "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "ramfs", "cgroup", "cgroup2",
+        "securityfs", "debugfs", "tracefs", "pstore", "bpf", "configfs", "fusectl",
+        "mqueue", "hugetlbfs", "binfmt_misc", "autofs", "rpc_pipefs", "nsfs",
+        "efivarfs", "selinuxfs", "overlay", "squashfs", "iso9660", "nfsd", "fuse.lxcfs",
+        "fuse.gvfsd-fuse", "fuse.portal",
+    ))
+    # 网络文件系统(按策略决定是否统计) =====================================
+    REMOTE_FS = frozenset((
+        "nfs", "nfs4", "cifs", "smb3", "smbfs", "ceph", "glusterfs", "fuse.glusterfs",
+        "fuse.sshfs", "fuse.s3fs", "9p", "afs", "lustre", "gpfs",
+    ))
+    MOUNT_INFO = "/proc/self/mountinfo"
+    MBYTES = 1024 * 1024
+
+    def __init__(self, remote: bool = False, timeout: float = 2.0, workers: int = 4,
+                 refresh: float = 300.0, skip: tuple = ("/",)):
+        self.remote = remote  # 是否统计网络文件系统
+        self.timeout = timeout  # 单个挂载点 statvfs 超时(秒)
+        self.refresh = refresh  # 无法监听挂载表时的重新读取周期(秒)
+        self.skip = skip  # 不计入数据盘的挂载点(系统盘单独统计)
+        self.mounts: list = []  # 当前需要统计的挂载点
+        self.values: dict = {}  # 挂载点 -> [总空间MB, 已用空间MB]
+        self.stale: list = []  # 本轮超时、沿用旧值的挂载点
+        self.pending: dict = {}  # 挂载点 -> 尚未返回的 statvfs 任务
+        self.loaded = 0.0  # 上次读取挂载表的时间(单调时钟)
+        self.poller = None
+        self.handle = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hdd-mount")
+
+    # 挂载表是否变化 ========================================================
+    def changed(self) -> bool:
+        """Linux 上 mountinfo 变化时 poll 返回 POLLPRI，其余平台按周期刷新"""
+        if self.poller is None and hasattr(select, "poll") and os.path.exists(self.MOUNT_INFO):
+            try:
+                self.handle = os.open(self.MOUNT_INFO, os.O_RDONLY)
+                self.poller = select.poll()
+                self.poller.register(self.handle, select.POLLPRI | select.POLLERR)
+                self.poller.poll(0)  # 清除首次事件
+                return True
+            except OSError as e:
+                logger.warning("[挂载点清单] 无法监听挂载表: {}", e)
+                self.poller = None
+        if self.poller is not None:
+            return bool(self.poller.poll(0))
+        return time.monotonic() - self.loaded >= self.refresh
+
+    # 过滤策略 ==============================================================
+    def wanted(self, mount: str, fs_type: str) -> bool:
+        if mount in self.skip or not fs_type or fs_type in self.PSEUDO_FS:
+            return False
+        if fs_type in self.REMOTE_FS or fs_type.startswith("nfs"):
+            return self.remote
+        return True
+
+    # 解析挂载表 ============================================================
+    @staticmethod
+    def unescape(text: str) -> str:
+        """mountinfo 中空格等字符以八进制转义(如 \\040)"""
+        if "\\" not in text:
+            return text
+        return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), text)
+
+    def inventory(self) -> list:
+        mounts, devices = [], set()
+        if self.handle is not None:
+            os.lseek(self.handle, 0, os.SEEK_SET)
+            chunks = []
+            while True:
+                chunk = os.read(self.handle, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            for line in b"".join(chunks).decode("utf-8", "replace").splitlines():
+                parts = line.split(" - ", 1)
+                if len(parts) != 2:
+                    continue
+                head, tail = parts[0].split(), parts[1].split()
+                if len(head) < 5 or not tail:
+                    continue
+                mount = self.unescape(head[4])
+                if head[2] in devices or not self.wanted(mount, tail[0]):
+                    continue  # 同一设备的绑定挂载只统计一次
+                devices.add(head[2])
+                mounts.append(mount)
+        else:
+            for disk in psutil.disk_partitions(all=False):
+                if "cdrom" in disk.opts or disk.device in devices:
+                    continue
+                if self.wanted(disk.mountpoint, disk.fstype.lower()):
+                    devices.add(disk.device)
+                    mounts.append(disk.mountpoint)
+        self.loaded = time.monotonic()
+        return mounts
+
+    # 查询空间 ==============================================================
+    @classmethod
+    def measure(cls, mount: str) -> list:
+        if hasattr(os, "statvfs"):
+            stat = os.statvfs(mount)
+            total = stat.f_blocks * stat.f_frsize
+            used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        else:
+            usage = psutil.disk_usage(mount)
+            total, used = usage.total, usage.used
+        return [int(total / cls.MBYTES), int(used / cls.MBYTES)]
+
+    # 数据盘使用量 ==========================================================
+    def usage(self) -> dict:
+        """返回 {挂载点: [总空间MB, 已用空间MB]}，已卸载的挂载点自动移除"""
+        if self.changed():
+            self.mounts = self.inventory()
+            logger.info("[挂载点清单] 重新读取挂载表: {} 个数据盘", len(self.mounts))
+        # 并发提交，仍卡住的挂载点不再重复提交 ==============================
+        started = time.monotonic()
+        for mount in self.mounts:
+            if mount not in self.pending:
+                self.pending[mount] = self.executor.submit(self.measure, mount)
+        values, stale = {}, []
+        for mount in self.mounts:
+            future = self.pending[mount]
+            try:
+                values[mount] = future.result(timeout=max(0.0, started + self.timeout - time.monotonic()))
+            except concurrent.futures.TimeoutError:
+                stale.append(mount)
+                if mount in self.values:
+                    values[mount] = self.values[mount]
+                logger.warning("[挂载点清单] 挂载点无响应，沿用旧值: {}", mount)
+                continue
+            except Exception as e:
+                logger.warning("[挂载点清单] 读取挂载点失败 {}: {}", mount, e)
+            del self.pending[mount]
+        for mount in list(self.pending):
+            if mount not in self.mounts and self.pending[mount].done():
+                del self.pending[mount]
+        self.values = values
+        self.stale = stale
+        return values
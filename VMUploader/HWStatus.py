@@ -1,82 +1,55 @@
-import json
 from .VMPowers import VMPowers as VPower
+from .VMSchema import VMField, VMSchema
 
 
-class HWStatus:
-    def __init__(self, config=None, /, **kwargs):
+class HWStatus(metaclass=VMSchema):
+    FIELDS = (
         # 基础数据 ============================
-        self.ac_status: VPower = VPower.UNKNOWN
-        self.cpu_model: str = ""  # 当前CPU名称
-        self.cpu_total: int = 0  # 当前核心总计
-        self.cpu_usage: int = 0  # 当前核心已用
-        self.mem_total: int = 0  # 当前内存总计
-        self.mem_usage: int = 0  # 当前内存已用
-        self.hdd_total: int = 0  # 当前磁盘总计
-        self.hdd_usage: int = 0  # 当前磁盘已用
-        self.ext_usage: dict = {}  # 数据盘已用
+        VMField("ac_status", "power", VPower.UNKNOWN),
+        VMField("cpu_model", "str", "", "当前CPU名称"),
+        VMField("cpu_total", "int", 0, "当前核心总计"),
+        VMField("cpu_usage", "int", 0, "当前核心已用"),
+        VMField("cpu_cores", "dict", None, "各核心使用率{序号: %}"),
+        VMField("cpu_modes", "dict", None, "各模式占比{user/system/iowait/steal: %}"),
+        VMField("mem_total", "int", 0, "当前内存总计"),
+        VMField("mem_usage", "int", 0, "当前内存已用"),
+        VMField("hdd_total", "int", 0, "当前磁盘总计"),
+        VMField("hdd_usage", "int", 0, "当前磁盘已用"),
+        VMField("ext_usage", "dict", None, "数据盘已用"),
+        VMField("ext_stale", "list", None, "无响应、沿用旧值的数据盘"),
         # 网络信息 ============================
-        self.flu_total: int = 0  # 当前流量总计
-        self.flu_usage: int = 0  # 当前流量已用
-        self.nat_total: int = 0  # 当前端口总计
-        self.nat_usage: int = 0  # 当前端口已用
-        self.web_total: int = 0  # 当前代理总计
-        self.web_usage: int = 0  # 当前代理已用
+        VMField("flu_total", "int", 0, "当前流量总计"),
+        VMField("flu_usage", "int", 0, "当前流量已用"),
+        VMField("nat_total", "int", 0, "当前端口总计"),
+        VMField("nat_usage", "int", 0, "当前端口已用"),
+        VMField("web_total", "int", 0, "当前代理总计"),
+        VMField("web_usage", "int", 0, "当前代理已用"),
         # 其他信息 ============================
-        self.gpu_usage: dict = {}  # GPU 使用率
-        self.gpu_total: int = 0  # 当前显卡数量
-        self.network_u: int = 0  # 当前上行带宽
-        self.network_d: int = 0  # 当前下行带宽
-        self.cpu_heats: int = 0  # 当前核心温度
-        self.cpu_power: int = 0  # 当前核心功耗
+        VMField("gpu_usage", "dict", None, "GPU 使用率"),
+        VMField("gpu_total", "int", 0, "当前显卡数量"),
+        VMField("gpu_stats", "dict", None, "GPU[使用率, 已用显存MB, 温度]"),
+        VMField("network_u", "float", 0, "当前上行带宽(Mbps)"),
+        VMField("network_d", "float", 0, "当前下行带宽(Mbps)"),
+        VMField("network_a", "int", 0, "主网卡链路速率(Mbps)"),
+        VMField("nic_usage", "dict", None, "各网卡带宽[上行, 下行]"),
+        VMField("cpu_heats", "int", 0, "当前核心温度"),
+        VMField("cpu_power", "int", 0, "当前核心功耗"),
+        VMField("win_stats", "dict", None, "高频采样窗口统计[最小, 平均, 最大, P95]"),
+        VMField("col_delay", "int", 0, "本轮采集耗时(毫秒)"),
+        VMField("col_stale", "list", None, "超时、沿用旧值的采集项"),
+        VMField("col_trace", "dict", None, "代理自身耗时统计{名称: [次数, 平均ms, 最大ms] 或 次数}(可选)"),
+        VMField("col_uuid", "str", "", "本份状态的唯一编号，补报时不变，控制器据此去重"),
         # 虚拟机信息 ============================
-        self.vm_name: str = ""  # 虚拟机名称
-        self.vm_pass: str = ""  # 虚拟机密码
-        # 加载传入的参数 ======================
-        if config is not None:
-            self.__read__(config)
-        self.__load__(**kwargs)
+        VMField("vm_name", "str", "", "虚拟机名称"),
+        VMField("vm_pass", "str", "", "虚拟机密码"),
+    )
 
-    # 加载数据 ================================
+    # 兼容旧接口 ==============================
     def __load__(self, **kwargs):
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        self.update(kwargs)
 
-    # 读取数据 ================================
     def __read__(self, data: dict):
-        for key, value in data.items():
-            if key in self.__dict__:
-                setattr(self, key, value)
+        self.update(data)
 
-    # 转换为字典 ==============================
     def __dict__(self):
-        return {
-            "ac_status": VPower.__str__(
-                self.ac_status),
-            "cpu_model": self.cpu_model,
-            "cpu_total": self.cpu_total,
-            "cpu_usage": self.cpu_usage,
-            "mem_total": self.mem_total,
-            "mem_usage": self.mem_usage,
-            "hdd_total": self.hdd_total,
-            "hdd_usage": self.hdd_usage,
-            "ext_usage": self.ext_usage,
-            "flu_total": self.flu_total,
-            "flu_usage": self.flu_usage,
-            "nat_total": self.nat_total,
-            "nat_usage": self.nat_usage,
-            "web_total": self.web_total,
-            "web_usage": self.web_usage,
-            "gpu_usage": self.gpu_usage,
-            "gpu_total": self.gpu_total,
-            "network_u": self.network_u,
-            "network_d": self.network_d,
-            "cpu_heats": self.cpu_heats,
-            "cpu_power": self.cpu_power,
-            "vm_name": self.vm_name,
-            "vm_pass": self.vm_pass,
-        }
-
-    # 转换为文本 ==============================
-    def __str__(self):
-        return json.dumps(self.__dict__())
+        return self.to_dict()
@@ -0,0 +1,79 @@
+import time
+import psutil
+
+
+class NETStats:
+    """带宽统计：按网卡保存基线，用单调时钟的真实间隔计算速率"""
+    # 不计入带宽的回环及虚拟网桥前缀 ========================================
+    SKIP_NAMES = ("lo", "loopback", "docker", "veth", "virbr", "br-", "vnet",
+                  "cni", "flannel", "cali", "vxlan", "kube-", "ovs-", "tap")
+    WRAP_32 = 1 << 32  # 32位计数器回绕边界
+    MBYTES = 1024 * 1024
+
+    def __init__(self, skip_names: tuple = None, reader=None, wrap32: bool = False):
+        self.wrap32 = wrap32  # 计数器确为32位时才按回绕处理(Linux /proc 及 psutil 均为64位)
+        self.reader = reader  # ProcRead 直读后端，None 时使用 psutil
+        self.skip_names = skip_names if skip_names is not None else self.SKIP_NAMES
+        self.last: dict = {}  # 网卡 -> (单调时间, 累计发送字节, 累计接收字节)
+        self.nics: dict = {}  # 网卡 -> [上行Mbps, 下行Mbps]
+        self.network_u: float = 0.0  # 全部网卡上行(Mbps)
+        self.network_d: float = 0.0  # 全部网卡下行(Mbps)
+        self.flu_bytes: int = 0  # 本窗口双向流量(字节)
+        self.flu_carry: int = 0  # 不足1MB的流量留到下一窗口，避免计费丢失
+        self.busiest: str = ""  # 本窗口流量最大的网卡
+
+    # 是否跳过 ==============================================================
+    def skipped(self, nic_name: str) -> bool:
+        return nic_name.lower().startswith(self.skip_names)
+
+    # 计数器增量 ============================================================
+    def delta(self, last: int, curr: int) -> int:
+        """计数器减小视为网卡重建或被重置(从0重新计数)；只有已知为32位计数器时才按回绕处理"""
+        if curr >= last:
+            return curr - last
+        if self.wrap32 and self.WRAP_32 // 2 <= last < self.WRAP_32:
+            return curr + self.WRAP_32 - last  # 32位计数器回绕
+        return curr
+
+    # 采样 ==================================================================
+    def sample(self, counters: dict = None) -> int:
+        """更新各网卡速率，返回本窗口双向流量(MB，整数部分)"""
+        if counters is not None:
+            items = [(name, data.bytes_sent, data.bytes_recv) for name, data in counters.items()]
+        elif self.reader is not None:
+            items = list(self.reader.net_items())
+        else:
+            counters = psutil.net_io_counters(pernic=True, nowrap=False)
+            items = [(name, data.bytes_sent, data.bytes_recv) for name, data in counters.items()]
+        now = time.monotonic()
+        nics, flu_bytes, top_bytes = {}, 0, -1
+        total_u = total_d = 0.0
+        for nic_name, bytes_sent, bytes_recv in items:
+            if self.skipped(nic_name):
+                continue
+            last = self.last.get(nic_name)
+            self.last[nic_name] = (now, bytes_sent, bytes_recv)
+            if last is None or now <= last[0]:
+                continue  # 新出现的网卡只建立基线
+            sent = self.delta(last[1], bytes_sent)
+            recv = self.delta(last[2], bytes_recv)
+            elapsed = now - last[0]
+            rate_u = sent * 8 / elapsed / 1000000
+            rate_d = recv * 8 / elapsed / 1000000
+            nics[nic_name] = [round(rate_u, 3), round(rate_d, 3)]
+            total_u += rate_u
+            total_d += rate_d
+            flu_bytes += sent + recv
+            if sent + recv > top_bytes:
+                top_bytes, self.busiest = sent + recv, nic_name
+        # 移除已消失网卡的基线 ==============================================
+        present = {item[0] for item in items}
+        for nic_name in list(self.last):
+            if nic_name not in present:
+                del self.last[nic_name]
+        self.nics = nics
+        self.network_u = round(total_u, 3)
+        self.network_d = round(total_d, 3)
+        self.flu_bytes = flu_bytes
+        flu_usage, self.flu_carry = divmod(self.flu_carry + flu_bytes, self.MBYTES)
+        return flu_usage
@@ -0,0 +1,149 @@
+import os
+import array
+
+
+class ProcRead:
+    """Linux /proc 直读后端：文件常开，pread 读入复用的缓冲区，解析结果写入预分配数组；
+    每次读取仍会复制一份文件内容并按行切分，省去的是打开文件及 psutil 的对象开销"""
+    CPU_FIELDS = 10  # user nice system idle iowait irq softirq steal guest guest_nice
+    MEM_KEYS = (b"MemTotal:", b"MemFree:", b"Buffers:", b"Cached:", b"SReclaimable:", b"MemAvailable:")
+    FILES = ("stat", "meminfo", "net/dev")
+
+    def __init__(self, root: str = "/proc", size: int = 65536):
+        self.root = root
+        self.fds = {name: os.open(os.path.join(root, name), os.O_RDONLY) for name in self.FILES}
+        self.bufs = {name: bytearray(size) for name in self.FILES}
+        self.cpu = array.array("Q", bytes(8 * self.CPU_FIELDS))  # 第0行为总计，其后每核一行
+        self.cpu_count = 0
+        self.mem = array.array("Q", bytes(8 * len(self.MEM_KEYS)))  # 单位字节，顺序同 MEM_KEYS
+        self.nic_names: list = []
+        self.net = array.array("Q")  # 每块网卡 [接收字节, 发送字节]
+
+    @classmethod
+    def available(cls, root: str = "/proc") -> bool:
+        return all(os.access(os.path.join(root, name), os.R_OK) for name in cls.FILES)
+
+    # 读取文件 ==============================================================
+    def read(self, name: str) -> bytes:
+        """从偏移0重新读取整个文件，缓冲区不足时翻倍"""
+        fd, buf = self.fds[name], self.bufs[name]
+        while True:
+            if hasattr(os, "preadv"):
+                size = os.preadv(fd, [buf], 0)
+            else:
+                data = os.pread(fd, len(buf), 0)
+                size = len(data)
+                buf[:size] = data
+            if size < len(buf):
+                return memoryview(buf)[:size].tobytes()
+            buf.extend(bytes(len(buf)))
+
+    # /proc/stat ============================================================
+    def read_stat(self) -> array.array:
+        lines = [line for line in self.read("stat").split(b"\n") if line.startswith(b"cpu")]
+        if len(lines) * self.CPU_FIELDS != len(self.cpu):  # CPU 热插拔时调整数组
+            self.cpu = array.array("Q", bytes(8 * self.CPU_FIELDS * len(lines)))
+        self.cpu_count = len(lines) - 1
+        cpu = self.cpu
+        for row, line in enumerate(lines):
+            base = row * self.CPU_FIELDS
+            for index, value in enumerate(line.split()[1:self.CPU_FIELDS + 1]):
+                cpu[base + index] = int(value)
+        return cpu
+
+    # /proc/meminfo =========================================================
+    def read_meminfo(self) -> array.array:
+        mem, keys = self.mem, self.MEM_KEYS
+        for line in self.read("meminfo").split(b"\n"):
+            key, _, rest = line.partition(b" ")
+            if key in keys:
+                mem[keys.index(key)] = int(rest.split()[0]) * 1024  # kB -> 字节
+        return mem
+
+    def mem_usage(self) -> tuple:
+        """返回 (总内存, 已用内存) 字节，算法与 psutil 一致"""
+        total, free, buffers, cached, reclaim, _ = self.read_meminfo()
+        used = total - free - buffers - cached - reclaim
+        return total, used if used >= 0 else total - free
+
+    # /proc/net/dev =========================================================
+    def read_netdev(self) -> array.array:
+        lines = self.read("net/dev").split(b"\n")[2:]
+        names = [line.partition(b":")[0].strip().decode() for line in lines if b":" in line]
+        if names != self.nic_names:
+            self.nic_names = names
+            self.net = array.array("Q", bytes(16 * len(names)))
+        net, row = self.net, 0
+        for line in lines:
+            if b":" not in line:
+                continue
+            fields = line.partition(b":")[2].split()
+            net[row * 2] = int(fields[0])  # 接收字节
+            net[row * 2 + 1] = int(fields[8])  # 发送字节
+            row += 1
+        return net
+
+    def net_items(self):
+        """逐块网卡产出 (名称, 发送字节, 接收字节)"""
+        net = self.read_netdev()
+        for row, name in enumerate(self.nic_names):
+            yield name, net[row * 2 + 1], net[row * 2]
+
+    # 关闭 ==================================================================
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+
+
+if __name__ == "__main__":
+    # 录制数据自检，或读取真实/录制的 /proc: python -m VMUploader.ProcRead [根目录]
+    import sys
+    import shutil
+    import tempfile
+
+    FIXTURE = {
+        "stat": "cpu  100 5 50 800 20 1 2 3 40 0\n"
+                "cpu0 60 5 30 380 10 1 1 3 40 0\n"
+                "cpu1 40 0 20 420 10 0 1 0 0 0\n"
+                "intr 12345 0 0\nctxt 999\nbtime 1700000000\n",
+        "meminfo": "MemTotal:        8000000 kB\nMemFree:         1000000 kB\n"
+                   "MemAvailable:    5000000 kB\nBuffers:          200000 kB\n"
+                   "Cached:          2000000 kB\nSwapCached:            0 kB\n"
+                   "SReclaimable:     300000 kB\n",
+        "net/dev": "Inter-|   Receive                            |  Transmit\n"
+                   " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets\n"
+                   "    lo:    5000      50    0    0    0     0          0         0     5000      50"
+                   "    0    0    0     0       0          0\n"
+                   "  eth0: 1234567    1000    0    0    0     0          0         0   765432     900"
+                   "    0    0    0     0       0          0\n"
+                   "eth1:98765432109 77 0 0 0 0 0 0 12345678901 66 0 0 0 0 0 0\n",  # 冒号后无空格
+    }
+    if len(sys.argv) == 1:
+        root = tempfile.mkdtemp()
+        for name, text in FIXTURE.items():
+            os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+            with open(os.path.join(root, name), "w") as f:
+                f.write(text)
+        reader = ProcRead(root, size=64)  # 缓冲区小于文件，验证自动扩容
+        assert ProcRead.available(root)
+        cpu = reader.read_stat()
+        assert reader.cpu_count == 2 and list(cpu[:10]) == [100, 5, 50, 800, 20, 1, 2, 3, 40, 0], list(cpu)
+        assert list(cpu[20:24]) == [40, 0, 20, 420], list(cpu)
+        assert reader.mem_usage() == (8000000 * 1024, (8000000 - 1000000 - 200000 - 2000000 - 300000) * 1024)
+        assert list(reader.net_items()) == [("lo", 5000, 5000), ("eth0", 765432, 1234567),
+                                            ("eth1", 12345678901, 98765432109)], list(reader.net_items())
+        # 文件变化(网卡消失、计数增长)后重新读取 ============================
+        with open(os.path.join(root, "net/dev"), "w") as f:
+            f.write(FIXTURE["net/dev"].split("\n", 2)[0] + "\n\n" + "eth1:1 0 0 0 0 0 0 0 2 0 0 0 0 0 0 0\n")
+        assert list(reader.net_items()) == [("eth1", 2, 1)], list(reader.net_items())
+        reader.close()
+        shutil.rmtree(root)
+        print("ProcRead OK")
+        sys.exit(0)
+    reader = ProcRead(sys.argv[1])
+    reader.read_stat()
+    print("CPU  :", reader.cpu_count, "核", list(reader.cpu[:ProcRead.CPU_FIELDS]))
+    print("内存 :", reader.mem_usage())
+    print("网卡 :", list(reader.net_items()))
+    reader.close()
@@ -0,0 +1,41 @@
+import array
+import threading
+
+
+class RingBuff:
+    """定长环形缓冲区：数组存储，写满后覆盖最旧样本，采样时不产生新对象"""
+
+    def __init__(self, size: int = 60):
+        self.size = max(1, size)
+        self.data = array.array("d", bytes(8 * self.size))  # 预分配的双精度数组
+        self.head = 0  # 下一个写入位置
+        self.count = 0  # 当前有效样本数
+        self.lock = threading.Lock()
+
+    # 写入样本 ==============================================================
+    def push(self, value: float):
+        with self.lock:
+            self.data[self.head] = value
+            self.head = (self.head + 1) % self.size
+            if self.count < self.size:
+                self.count += 1
+
+    # 清空窗口 ==============================================================
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.count = 0
+
+    # 窗口统计 ==============================================================
+    def stats(self, reset: bool = False) -> list:
+        """返回窗口内 [最小, 平均, 最大, P95]，无样本时全为0"""
+        with self.lock:
+            if self.count == 0:
+                return [0, 0, 0, 0]
+            values = sorted(self.data[:self.count])
+            if reset:
+                self.head = 0
+                self.count = 0
+        rank = max(0, -(-len(values) * 95 // 100) - 1)  # 最近秩法
+        return [round(values[0], 2), round(sum(values) / len(values), 2),
+                round(values[-1], 2), round(values[rank], 2)]
@@ -0,0 +1,206 @@
+import time
+import signal
+import asyncio
+import threading
+from loguru import logger
+from .VMTracer import tracer
+
+
+class VMAgents:
+    """异步代理核心：采集、上报、配置应用分别为独立任务，按单调时钟调度"""
+
+    def __init__(self, collect, upload, apply, interval: float = 60.0,
+                 sample=None, sample_rate: float = 1.0, probe=None, probe_interval: float = 15.0,
+                 batch_size: int = 1, flush_interval: float = None, listen=None, spool=None):
+        self.collect = collect  # 采集函数: () -> 状态字典
+        self.sample = sample  # 高频采样函数: () -> None，可选
+        self.sample_rate = sample_rate  # 高频采样频率(Hz)
+        self.probe = probe  # 端点探测函数: () -> None，可选
+        self.probe_interval = probe_interval  # 端点探测周期(秒)
+        self.upload = upload  # 上报函数: (状态字典或批量样本, 配置投递函数) -> None
+        self.batch_size = batch_size  # 每批样本数，1 为逐份上报
+        self.flush_interval = flush_interval  # 批量上报周期(秒)，None 为只按批大小发送
+        self.pending: list = []  # 尚未发送的样本 [(生成时间, 状态字典)]
+        self.spool = spool  # 本地缓存: (状态字典, 生成时间) -> None，可选
+        self.listen = listen  # 配置推送通道: (配置投递函数) -> None，在守护线程中持续运行，可选
+        self.apply = apply  # 应用函数: (控制器下发配置) -> None
+        self.interval = interval  # 采集周期(秒)
+        self.skipped = 0  # 因上一轮未完成而跳过的周期数
+        self.report_queue = None  # 待上报状态(单份或一批)
+        self.report_time = 0.0  # 队列中单份状态的生成时间
+        self.config_queue = None  # 待应用配置(只保留最新一份)
+        self.loop = None
+
+    # 投递最新数据 ==========================================================
+    @staticmethod
+    def offer(queue: asyncio.Queue, item):
+        """队列已满时丢弃旧数据，只保留最新一份"""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+    # 投递状态 ============================================================
+    def enqueue(self, vm_status: dict):
+        """单份上报模式：上一份仍未发送时写入本地缓存(稍后补报)，
+        未启用缓存时与新样本合并为一批，不丢弃未发送的样本"""
+        now = time.time()
+        if self.report_queue.full():
+            queued = self.report_queue.get_nowait()
+            if isinstance(queued, list):
+                self.report_queue.put_nowait(queued + [(now, vm_status)])
+                return
+            if self.spool is None:
+                self.report_queue.put_nowait([(self.report_time, queued), (now, vm_status)])
+                return
+            try:
+                self.spool(queued, self.report_time)
+                logger.warning("[代理上报任务] 上一份状态仍未发送，已写入本地缓存")
+            except Exception as e:
+                logger.error("[代理上报任务] 写入本地缓存失败，合并为一批: {}", e)
+                self.report_queue.put_nowait([(self.report_time, queued), (now, vm_status)])
+                return
+        self.report_time = now
+        self.report_queue.put_nowait(vm_status)
+
+    # 投递配置 ============================================================
+    def deliver(self, vm_data):
+        """任意线程收到控制器配置后立即交给配置任务"""
+        if vm_data:
+            self.loop.call_soon_threadsafe(self.offer, self.config_queue, vm_data)
+
+    # 发送批量样本 ========================================================
+    def flush(self):
+        """把已积累的样本作为一批交给上报任务，上一批仍未发送时合并，不丢弃样本"""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        if self.report_queue.full():
+            queued = self.report_queue.get_nowait()
+            batch = (queued if isinstance(queued, list) else [(self.report_time, queued)]) + batch
+        self.report_queue.put_nowait(batch)
+
+    # 线程中执行 ============================================================
+    @staticmethod
+    async def blocking(func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    # 定时调度 ==============================================================
+    async def schedule(self, interval: float, job, name: str):
+        """按单调时钟周期执行 job，落后时跳过错过的周期"""
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            try:
+                await job()
+            except Exception as e:
+                logger.error("[代理{}任务] 执行失败: {}", name, e)
+            next_at += interval
+            now = loop.time()
+            if next_at <= now:
+                missed = int((now - next_at) // interval) + 1
+                self.skipped += missed
+                tracer.count("cycle.skipped", missed)
+                next_at += missed * interval
+                logger.warning("[代理{}任务] 耗时过长，跳过 {} 个周期", name, missed)
+            await asyncio.sleep(next_at - now)
+
+    # 采集任务 ==============================================================
+    async def collector(self):
+        async def job():
+            vm_status = await self.blocking(self.collect)
+            if self.batch_size <= 1:
+                self.enqueue(vm_status)
+                return
+            self.pending.append((time.time(), vm_status))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+        await self.schedule(self.interval, job, "采集")
+
+    # 批量任务 ==============================================================
+    async def flusher(self):
+        async def job():
+            self.flush()
+
+        await asyncio.sleep(self.flush_interval)
+        await self.schedule(self.flush_interval, job, "批量")
+
+    # 采样任务 ==============================================================
+    async def sampler(self):
+        async def job():
+            await self.blocking(self.sample)
+
+        await self.schedule(1.0 / self.sample_rate, job, "采样")
+
+    # 探测任务 ==============================================================
+    async def prober(self):
+        async def job():
+            await self.blocking(self.probe)
+
+        await self.schedule(self.probe_interval, job, "探测")
+
+    # 上报任务 ==============================================================
+    async def uploader(self):
+        while True:
+            vm_status = await self.report_queue.get()
+            try:
+                await self.blocking(self.upload, vm_status, self.deliver)
+            except Exception as e:
+                logger.error("[代理上报任务] 上报失败: {}", e)
+
+    # 配置任务 ==============================================================
+    async def applier(self):
+        while True:
+            vm_data = await self.config_queue.get()
+            try:
+                await self.blocking(self.apply, vm_data)
+            except Exception as e:
+                logger.error("[代理配置任务] 应用失败: {}", e)
+
+    # 运行代理 ==============================================================
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.report_queue = asyncio.Queue(maxsize=1)
+        self.config_queue = asyncio.Queue(maxsize=1)
+        if self.listen is not None:  # 长轮询会长时间阻塞，不占用事件循环的线程池
+            threading.Thread(target=self.listen, args=(self.deliver,),
+                             name="vm-listen", daemon=True).start()
+        tasks = [self.collector(), self.uploader(), self.applier()]
+        if self.sample is not None and self.sample_rate > 0:
+            tasks.append(self.sampler())
+        if self.probe is not None:
+            tasks.append(self.prober())
+        if self.batch_size > 1 and self.flush_interval:
+            tasks.append(self.flusher())
+        try:  # SIGTERM 时正常退出，以便发送剩余样本
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass  # Windows 不支持
+        await asyncio.gather(*tasks)
+
+    # 退出 ==================================================================
+    def shutdown(self):
+        """事件循环结束后同步发送尚未上报的样本"""
+        batch = list(self.pending)
+        if self.report_queue is not None and self.report_queue.full():
+            queued = self.report_queue.get_nowait()
+            batch = (queued if isinstance(queued, list) else [(self.report_time, queued)]) + batch
+        self.pending = []
+        if not batch:
+            return
+        logger.info("[代理退出] 发送剩余 {} 份样本", len(batch))
+        try:
+            self.upload(batch, None)
+        except Exception as e:
+            logger.error("[代理退出] 发送失败: {}", e)
+
+    def start(self):
+        try:
+            asyncio.run(self.run())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        finally:
+            self.shutdown()
+            tracer.dump()
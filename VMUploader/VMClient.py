@@ -0,0 +1,130 @@
+import time
+import threading
+import requests
+import concurrent.futures
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+
+class VMClient:
+    """控制器长连接客户端：按端点复用连接池，连接/读取超时分开设置"""
+
+    def __init__(self, conn_timeout: float = 3.0, read_timeout: float = 5.0,
+                 pool_size: int = 2, pool_hosts: int = 8, idle_limit: float = 300.0,
+                 workers: int = 4):
+        self.conn_timeout = conn_timeout  # 建立连接超时(秒)
+        self.read_timeout = read_timeout  # 等待响应超时(秒)
+        self.pool_size = pool_size  # 每个端点保持的连接数
+        self.pool_hosts = pool_hosts  # 同时缓存的端点数
+        self.idle_limit = idle_limit  # 端点空闲多久后丢弃连接池(秒)
+        self.workers = workers  # 并发请求线程数
+        self.last_used: dict = {}  # 端点 -> 最后使用时间(单调时钟)
+        self.lock = threading.Lock()
+        self.session = self.__make__()
+        self.executor = None  # 并发请求线程池(首次使用时创建)
+
+    # 创建会话 ==============================================================
+    def __make__(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_hosts,
+                              pool_maxsize=self.pool_size,
+                              max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    # 端点标识 ==============================================================
+    @staticmethod
+    def endpoint(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    # 丢弃端点连接 ==========================================================
+    def reset(self, url: str = None):
+        """丢弃指定端点(或全部)的已缓存连接，下次请求重新建立"""
+        with self.lock:
+            if url is None:
+                self.session.close()
+                self.session = self.__make__()
+                self.last_used.clear()
+                return
+            # 按 (协议, 主机, 端口) 查找 requests 实际使用的连接池，其键还含 TLS 参数，
+            # 不能用 connection_from_url 重新推算 ==============================
+            parts = urlsplit(url)
+            scheme, host = parts.scheme.lower(), (parts.hostname or "").lower()
+            port = parts.port or (443 if scheme == "https" else 80)
+            pools = self.session.get_adapter(url).poolmanager.pools
+            for key in pools.keys():
+                if (key.key_scheme, key.key_host, key.key_port) == (scheme, host, port):
+                    try:
+                        del pools[key]  # 移出时由 PoolManager 关闭连接池
+                    except KeyError:
+                        pass
+            self.last_used.pop(self.endpoint(url), None)
+
+    # 发送请求 ==============================================================
+    def request(self, method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+        """发送请求，复用的连接已失效时自动重连一次"""
+        if timeout is None:
+            timeout = (self.conn_timeout, self.read_timeout)
+        host = self.endpoint(url)
+        now = time.monotonic()
+        last = self.last_used.get(host)
+        if last is not None and now - last > self.idle_limit:
+            self.reset(url)  # 长时间空闲的连接大概率已被对端关闭
+            last = None
+        try:
+            result = self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            if last is None or isinstance(e, requests.exceptions.ConnectTimeout):
+                raise
+            # 复用的连接已被对端关闭，重建后再试一次 ========================
+            logger.debug("[控制器连接] 连接已失效，重新连接 {}: {}", host, e)
+            self.reset(url)
+            result = self.session.request(method, url, timeout=timeout, **kwargs)
+        self.last_used[host] = time.monotonic()
+        return result
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    # 并发请求 ==============================================================
+    def fan_out(self, method: str, urls: list, deadline: float = 8.0, build=None, **kwargs):
+        """并发请求全部端点，按完成先后产出 (url, 响应或异常)，整体不超过 deadline 秒
+        build(url) 可返回该端点专用的请求参数，与 kwargs 合并"""
+        if not urls:
+            return
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="vm-client")
+        timeout = (min(self.conn_timeout, deadline), min(self.read_timeout, deadline))
+        futures = {}
+        for url in urls:
+            params = dict(kwargs, **build(url)) if build is not None else kwargs
+            futures[self.executor.submit(self.request, method, url, timeout=timeout, **params)] = url
+        pending = dict(futures)
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=deadline):
+                url = pending.pop(future)
+                try:
+                    yield url, future.result()
+                except Exception as e:
+                    yield url, e
+        except concurrent.futures.TimeoutError:
+            for future, url in pending.items():
+                future.cancel()
+                yield url, requests.exceptions.Timeout(f"超过本轮截止时间 {deadline}s")
+
+    # 关闭连接 ==============================================================
+    def close(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+            self.session.close()
+            self.last_used.clear()
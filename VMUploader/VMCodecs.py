@@ -0,0 +1,223 @@
+import struct
+from .VMPowers import VMPowers
+from NICManager.NCConfig import NCConfig
+
+
+class VMCodecs:
+    """紧凑二进制编码：固定字段顺序，报文头为 [类型, 版本] 两个字节"""
+    CONTENT_TYPE = "application/x-openidcs-binary"  # 二进制上报的 Content-Type
+    VERSION = 2
+    KIND_STATUS = 0x01  # HWStatus
+    KIND_POWERS = 0x02  # VMPowers
+    KIND_CONFIG = 0x03  # NCConfig
+    # HWStatus 版本1字段表(定长数值区一次打包，其后为变长区)，不再改动 =====
+    STATUS_FIXED = (
+        ("ac_status", "B"), ("cpu_total", "q"), ("cpu_usage", "q"),
+        ("mem_total", "q"), ("mem_usage", "q"), ("hdd_total", "q"), ("hdd_usage", "q"),
+        ("flu_total", "q"), ("flu_usage", "q"), ("nat_total", "q"), ("nat_usage", "q"),
+        ("web_total", "q"), ("web_usage", "q"), ("gpu_total", "q"),
+        ("network_u", "d"), ("network_d", "d"), ("cpu_heats", "q"), ("cpu_power", "q"),
+    )
+    STATUS_TEXTS = ("cpu_model", "vm_name", "vm_pass")
+    STATUS_MAPS = ("ext_usage", "gpu_usage", "nic_usage", "win_stats")
+    # 之后各版本追加的字段: 版本 -> ((名称, 类型 int/str/map/list), ...)，依次写在报文末尾；
+    # 新字段只能在新版本中追加，旧版本报文按其版本号解码 ====================
+    STATUS_TAILS = {
+        2: (("network_a", "int"), ("col_delay", "int"), ("gpu_stats", "map"),
+            ("ext_stale", "list"), ("col_stale", "list"), ("col_trace", "map"),
+            ("cpu_cores", "map"), ("cpu_modes", "map"), ("col_uuid", "str")),
+    }
+    STATUS_BLOCK = struct.Struct("<" + "".join(code for _, code in STATUS_FIXED))
+    CONFIG_SCHEMA = ("mac_addr", "nic_type", "ip4_addr", "ip6_addr", "ip4_gate", "ip6_gate")
+    HEAD = struct.Struct("<BB")
+    INT = struct.Struct("<q")
+    FLOAT = struct.Struct("<d")
+    SIZE = struct.Struct("<H")
+
+    # 基础类型写入 ==========================================================
+    @classmethod
+    def put_str(cls, out: bytearray, value):
+        data = str(value).encode("utf-8")
+        out += cls.SIZE.pack(len(data))
+        out += data
+
+    @classmethod
+    def put_map(cls, out: bytearray, value: dict):
+        """字典: 数量 + [键, 数值个数, 数值...]，数值统一为双精度"""
+        out += cls.SIZE.pack(len(value))
+        for key, item in value.items():
+            cls.put_str(out, key)
+            items = item if isinstance(item, (list, tuple)) else [item]
+            out.append(len(items))
+            for number in items:
+                out += cls.FLOAT.pack(number)
+
+    # 基础类型读取 ==========================================================
+    @classmethod
+    def get_str(cls, data: memoryview, offset: int) -> tuple:
+        size, = cls.SIZE.unpack_from(data, offset)
+        offset += cls.SIZE.size
+        return str(data[offset:offset + size], "utf-8"), offset + size
+
+    @classmethod
+    def get_map(cls, data: memoryview, offset: int) -> tuple:
+        count, = cls.SIZE.unpack_from(data, offset)
+        offset += cls.SIZE.size
+        value = {}
+        for _ in range(count):
+            key, offset = cls.get_str(data, offset)
+            items = data[offset]
+            offset += 1
+            numbers = struct.unpack_from(f"<{items}d", data, offset)
+            offset += 8 * items
+            numbers = [int(n) if n.is_integer() else n for n in numbers]
+            value[key] = numbers if items != 1 else numbers[0]
+        return value, offset
+
+    # 报文头 ================================================================
+    @classmethod
+    def check(cls, data, kind: int) -> memoryview:
+        data = memoryview(data)
+        head_kind, version = cls.HEAD.unpack_from(data, 0)
+        if head_kind != kind:
+            raise ValueError(f"报文类型不匹配: {head_kind}")
+        if not 1 <= version <= cls.VERSION:
+            raise ValueError(f"不支持的报文版本: {version}")
+        return data
+
+    # HWStatus ==============================================================
+    @classmethod
+    def dumps_status(cls, vm_status: dict) -> bytes:
+        out = bytearray(cls.HEAD.pack(cls.KIND_STATUS, cls.VERSION))
+        fixed = [cls.power(vm_status.get("ac_status")).value]
+        for name, code in cls.STATUS_FIXED[1:]:
+            value = vm_status.get(name) or 0
+            fixed.append(float(value) if code == "d" else int(value))
+        out += cls.STATUS_BLOCK.pack(*fixed)
+        for name in cls.STATUS_TEXTS:
+            cls.put_str(out, vm_status.get(name) or "")
+        for name in cls.STATUS_MAPS:
+            cls.put_map(out, vm_status.get(name) or {})
+        for version in range(2, cls.VERSION + 1):
+            for name, kind in cls.STATUS_TAILS[version]:
+                value = vm_status.get(name)
+                if kind == "int":
+                    out += cls.INT.pack(int(value or 0))
+                elif kind == "str":
+                    cls.put_str(out, value or "")
+                elif kind == "map":
+                    cls.put_map(out, value or {})
+                else:
+                    out += cls.SIZE.pack(len(value or []))
+                    for item in value or []:
+                        cls.put_str(out, item)
+        return bytes(out)
+
+    @classmethod
+    def loads_status(cls, data) -> dict:
+        """按报文自身的版本解码，旧版本报文没有后续版本追加的字段"""
+        data = cls.check(data, cls.KIND_STATUS)
+        fixed = cls.STATUS_BLOCK.unpack_from(data, cls.HEAD.size)
+        result = {name: value for (name, _), value in zip(cls.STATUS_FIXED, fixed)}
+        result["ac_status"] = VMPowers(result["ac_status"]).name
+        offset = cls.HEAD.size + cls.STATUS_BLOCK.size
+        for name in cls.STATUS_TEXTS:
+            result[name], offset = cls.get_str(data, offset)
+        for name in cls.STATUS_MAPS:
+            result[name], offset = cls.get_map(data, offset)
+        for version in range(2, data[1] + 1):  # data[1] 为报文版本
+            for name, kind in cls.STATUS_TAILS[version]:
+                if kind == "int":
+                    result[name], = cls.INT.unpack_from(data, offset)
+                    offset += cls.INT.size
+                elif kind == "str":
+                    result[name], offset = cls.get_str(data, offset)
+                elif kind == "map":
+                    result[name], offset = cls.get_map(data, offset)
+                else:
+                    count, = cls.SIZE.unpack_from(data, offset)
+                    offset += cls.SIZE.size
+                    result[name] = []
+                    for _ in range(count):
+                        item, offset = cls.get_str(data, offset)
+                        result[name].append(item)
+        if offset != len(data):
+            raise ValueError(f"报文长度不符: 解码 {offset} 字节，实际 {len(data)} 字节")
+        return result
+
+    # VMPowers ==============================================================
+    @staticmethod
+    def power(value) -> VMPowers:
+        if isinstance(value, str):
+            return VMPowers.from_json(value)
+        return VMPowers.UNKNOWN if value is None else value
+
+    @classmethod
+    def dumps_power(cls, value) -> bytes:
+        return cls.HEAD.pack(cls.KIND_POWERS, cls.VERSION) + bytes([cls.power(value).value])
+
+    @classmethod
+    def loads_power(cls, data) -> VMPowers:
+        data = cls.check(data, cls.KIND_POWERS)
+        return VMPowers(data[cls.HEAD.size])
+
+    # NCConfig ==============================================================
+    @classmethod
+    def dumps_config(cls, config: NCConfig) -> bytes:
+        out = bytearray(cls.HEAD.pack(cls.KIND_CONFIG, cls.VERSION))
+        for name in cls.CONFIG_SCHEMA:
+            cls.put_str(out, getattr(config, name))
+        return bytes(out)
+
+    @classmethod
+    def loads_config(cls, data) -> NCConfig:
+        data = cls.check(data, cls.KIND_CONFIG)
+        offset, fields = cls.HEAD.size, {}
+        for name in cls.CONFIG_SCHEMA:
+            fields[name], offset = cls.get_str(data, offset)
+        return NCConfig(**fields)
+
+
+if __name__ == "__main__":
+    # 往返校验及与JSON的体积/速度对比: python -m VMUploader.VMCodecs
+    import json
+    import timeit
+    from .HWStatus import HWStatus
+
+    hs = HWStatus(cpu_model="Intel Xeon", cpu_total=8, cpu_usage=37, cpu_cores={"0": 40.5, "1": 33},
+                  cpu_modes={"user": 30.2, "system": 5, "iowait": 1.5, "steal": 0}, mem_total=16384,
+                  mem_usage=8123, hdd_total=102400, hdd_usage=51200,
+                  ext_usage={"/data": [204800, 1024]}, ext_stale=["/data"], flu_usage=321,
+                  gpu_usage={"0": 55}, gpu_stats={"0": [55, 2048, 61]}, gpu_total=1, network_u=12.5, network_d=3.25,
+                  nic_usage={"eth0": [12.5, 3.25]}, vm_name="vm-01", vm_pass="secret",
+                  col_uuid="0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+                  win_stats={"cpu_usage": [1, 20.5, 99, 95]},
+                  col_trace={"status": [60, 12.5, 40.1], "post.timeout": 2})
+    hs.ac_status = VMPowers.STARTED
+    vm_status = hs.to_dict()
+    packed = VMCodecs.dumps_status(vm_status)
+    assert VMCodecs.loads_status(packed) == json.loads(json.dumps(vm_status)), "HWStatus 往返不一致"
+    VMCodecs.VERSION = 1  # 版本1报文只含版本1字段
+    legacy = VMCodecs.loads_status(VMCodecs.dumps_status(vm_status))
+    VMCodecs.VERSION = 2
+    assert "col_uuid" not in legacy and legacy["vm_name"] == "vm-01", "版本1报文解码错误"
+    for version in (0, VMCodecs.VERSION + 1):
+        try:
+            VMCodecs.loads_status(bytes([VMCodecs.KIND_STATUS, version]) + packed[2:])
+            raise AssertionError(f"未拒绝版本 {version}")
+        except ValueError:
+            pass
+    for power in VMPowers:
+        assert VMCodecs.loads_power(VMCodecs.dumps_power(power)) == power, "VMPowers 往返不一致"
+    nc = NCConfig(mac_addr="00:1C:c0:a8:01:02", nic_type="eth0", ip4_addr="192.168.1.2",
+                  ip4_gate="192.168.1.1", ip6_addr="fe80::1%eth0")
+    assert VMCodecs.loads_config(VMCodecs.dumps_config(nc)) == nc, "NCConfig 往返不一致"
+    text = json.dumps(vm_status).encode("utf-8")
+    rounds = 10000
+    for name, size, dumps, loads in (
+            ("JSON  ", len(text), lambda: json.dumps(vm_status), lambda: json.loads(text)),
+            ("Binary", len(packed), lambda: VMCodecs.dumps_status(vm_status),
+             lambda: VMCodecs.loads_status(packed))):
+        dumps_us = timeit.timeit(dumps, number=rounds) / rounds * 1e6
+        loads_us = timeit.timeit(loads, number=rounds) / rounds * 1e6
+        print(f"{name}: {size:5d} 字节, 编码 {dumps_us:.1f} us/次, 解码 {loads_us:.1f} us/次")
@@ -0,0 +1,137 @@
+import time
+import concurrent.futures
+from loguru import logger
+from .VMTracer import tracer
+
+
+class VMCollect:
+    """单个采集项：采集函数、刷新周期、耗时预算及上次结果缓存"""
+
+    def __init__(self, name: str, func, interval: float = 0.0, budget: float = 1.0,
+                 default=None, timeout: float = None, merge=None):
+        self.name = name
+        self.func = func  # 采集函数: () -> 值
+        self.interval = interval  # 刷新周期(秒)，0 为每轮，None 为只在启动及热插拔时
+        self.budget = budget  # 耗时预算(秒)，超出时告警
+        self.timeout = timeout if timeout is not None else max(2.0, budget * 2)  # 等待上限(秒)
+        self.future = None  # 并发模式下尚未完成的采集任务
+        self.value = default  # 上次结果
+        self.default = default
+        self.merge = merge  # 增量型采集项的合并函数: (较早增量, 较新增量) -> 增量，None 为状态型
+        self.carry = None  # 增量型: 超时后才返回、尚未上报的增量
+        self.late = False  # 增量型: 仍在运行的任务已超时，其结果需留到下一轮
+        self.updated = None  # 上次成功采集时间(单调时钟)，None 表示需要采集
+        self.elapsed = 0.0  # 上次采集耗时(秒)
+        self.stale = False  # 上次采集失败或超时，value 为旧值
+
+    # 是否到期 ==============================================================
+    def due(self, now: float) -> bool:
+        if self.updated is None:
+            return True
+        return self.interval is not None and now - self.updated >= self.interval
+
+    # 执行采集 ==============================================================
+    def run(self):
+        started = time.monotonic()
+        try:
+            self.value = self.func()
+            self.updated = started
+            self.stale = False
+        except Exception as e:
+            self.stale = True
+            if self.merge is not None:
+                self.value = self.default  # 增量型不沿用旧值，避免重复计费
+            tracer.count("collect.error")
+            logger.error("[采集项] {} 采集失败: {}", self.name, e)
+        self.elapsed = time.monotonic() - started
+        tracer.observe("collect." + self.name, self.elapsed)
+        if self.elapsed > self.budget:
+            logger.warning("[采集项] {} 耗时 {:.3f}s 超出预算 {:.3f}s", self.name, self.elapsed, self.budget)
+        return self.value
+
+    # 本轮上报值 ============================================================
+    def report(self):
+        """状态型返回最新值(超时时为旧值)；增量型超时时返回默认值，
+        迟到的增量合并进下一轮，既不重复也不丢失"""
+        if self.merge is None:
+            return self.value
+        if self.late:
+            return self.default
+        if self.carry is None:
+            return self.value
+        value, self.carry = self.merge(self.carry, self.value), None
+        return value
+
+    def keep(self):
+        """超时的任务已完成，结果留到下一轮与新增量合并"""
+        self.carry = self.value if self.carry is None else self.merge(self.carry, self.value)
+        self.late = False
+
+
+class VMRegistry:
+    """采集项注册表：每轮只运行到期的采集项，其余直接使用缓存；
+    并发模式下各采集项在线程池中同时运行，超时的沿用旧值并标记为过期；
+    增量型采集项(如流量)超时时本轮记为0，迟到的增量计入下一轮"""
+
+    def __init__(self, workers: int = 4):
+        self.items: dict = {}  # 名称 -> VMCollect
+        self.workers = workers  # 并发线程数，0 为逐个串行采集
+        self.executor = None
+        self.latency = 0.0  # 上一轮快照耗时(秒)
+
+    def register(self, name: str, func, interval: float = 0.0, budget: float = 1.0,
+                 default=None, timeout: float = None, merge=None) -> VMCollect:
+        self.items[name] = VMCollect(name, func, interval, budget, default, timeout, merge)
+        return self.items[name]
+
+    # 过期采集项 ============================================================
+    def stale(self) -> list:
+        return [name for name, item in self.items.items() if item.stale]
+
+    # 热插拔 ================================================================
+    def invalidate(self, *names):
+        """使指定(或全部静态)采集项在下一轮重新采集"""
+        for item in self.items.values():
+            if item.name in names or (not names and item.interval is None):
+                item.updated = None
+
+    # 采集 ==================================================================
+    def collect(self) -> dict:
+        """运行到期的采集项，返回全部采集项的最新值"""
+        started = time.monotonic()
+        if self.workers <= 0:
+            for item in self.items.values():
+                if item.due(started):
+                    item.run()
+        else:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="vm-collect")
+            # 上一轮超时但已完成的任务，其结果已写回缓存 ====================
+            for item in self.items.values():
+                if item.future is not None and item.future.done():
+                    item.future = None
+                    if item.late:
+                        item.keep()
+            # 提交到期任务，仍在运行的不重复提交 ============================
+            for item in self.items.values():
+                if item.future is None and item.due(started):
+                    item.future = self.executor.submit(item.run)
+            for item in self.items.values():
+                if item.future is None:
+                    continue
+                try:
+                    item.future.result(timeout=max(0.0, started + item.timeout - time.monotonic()))
+                    item.future = None
+                    item.late = False
+                except concurrent.futures.TimeoutError:
+                    item.stale = True
+                    item.late = item.merge is not None
+                    tracer.count("collect.timeout")
+                    logger.warning("[采集项] {} 超过 {:.1f}s 未返回，{}", item.name, item.timeout,
+                                   "本轮记为默认值，结果计入下一轮" if item.late else "沿用旧值")
+        self.latency = time.monotonic() - started
+        return {name: item.report() for name, item in self.items.items()}
+
+    def __getitem__(self, name: str):
+        return self.items[name].value
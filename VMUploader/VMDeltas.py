@@ -0,0 +1,81 @@
+import gzip
+import json
+import threading
+
+try:
+    import zstandard
+except ImportError:  # zstd 为可选依赖
+    zstandard = None
+
+
+class VMDeltas:
+    """增量上报编码：首次接触或控制器要求重新同步时发送全量，其余只发送变化字段"""
+
+    def __init__(self, compress: str = "gzip", min_size: int = 512):
+        if compress == "zstd" and zstandard is None:
+            compress = "gzip"
+        self.compress = compress  # 压缩算法: gzip / zstd / 空字符串不压缩
+        self.min_size = min_size  # 小于该字节数的报文不尝试压缩
+        self.seq = 0  # 报文序号
+        self.base: dict = {}  # 端点 -> (已确认序号, {字段: 编码后的值})
+        self.sent: dict = {}  # 端点 -> (待确认序号, {字段: 编码后的值})
+        self.lock = threading.Lock()
+
+    # 字段编码 ==============================================================
+    @staticmethod
+    def __pack__(vm_status: dict) -> dict:
+        """逐字段编码后比较，避免嵌套字典被原地修改导致基线失真"""
+        return {key: json.dumps(value, sort_keys=True, separators=(",", ":"))
+                for key, value in vm_status.items()}
+
+    # 压缩报文 ==============================================================
+    def deflate(self, body: bytes) -> tuple:
+        """返回 (报文, Content-Encoding)，压缩后不更小则原样返回"""
+        if not self.compress or len(body) < self.min_size:
+            return body, ""
+        if self.compress == "zstd":
+            packed = zstandard.ZstdCompressor(level=3).compress(body)
+        else:
+            packed = gzip.compress(body, compresslevel=6)
+        if len(packed) >= len(body):
+            return body, ""
+        return packed, self.compress
+
+    # 生成报文 ==============================================================
+    def encode(self, key: str, vm_status: dict) -> dict:
+        """为指定端点生成请求参数(data/headers)"""
+        fields = self.__pack__(vm_status)
+        with self.lock:
+            self.seq += 1
+            base = self.base.get(key)
+            if base is None:
+                payload = {"mode": "full", "seq": self.seq, "data": vm_status}
+            else:
+                payload = {"mode": "delta", "seq": self.seq, "base": base[0],
+                           "data": {name: vm_status[name] for name, text in fields.items()
+                                    if base[1].get(name) != text}}
+            self.sent[key] = (self.seq, fields)
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        body, encoding = self.deflate(body)
+        headers = {"Content-Type": "application/json"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return {"data": body, "headers": headers}
+
+    # 确认送达 ==============================================================
+    def commit(self, key: str):
+        """控制器已接收，作为后续增量的基线"""
+        with self.lock:
+            if key in self.sent:
+                self.base[key] = self.sent.pop(key)
+
+    # 重新同步 ==============================================================
+    def reset(self, key: str = None):
+        """丢弃基线，下一次发送全量"""
+        with self.lock:
+            if key is None:
+                self.base.clear()
+                self.sent.clear()
+            else:
+                self.base.pop(key, None)
+                self.sent.pop(key, None)
@@ -0,0 +1,103 @@
+import time
+import random
+import threading
+from loguru import logger
+from .VMTracer import tracer
+
+
+class VMEndpoint:
+    """单个候选控制器的健康状态"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.failures = 0  # 连续失败次数，0 为健康
+        self.latency = None  # 平滑后的响应延迟(秒)
+        self.last_ok = None  # 上次成功时间(Unix时间戳)
+        self.retry_at = 0.0  # 退避结束时间(单调时钟)，到期后由后台探测
+
+    def to_dict(self) -> dict:
+        return {"failures": self.failures,
+                "latency": round(self.latency, 4) if self.latency is not None else None,
+                "last_ok": self.last_ok,
+                "retry_in": max(0.0, round(self.retry_at - time.monotonic(), 1)) if self.failures else 0.0}
+
+
+class VMHealth:
+    """控制器端点健康管理：失败端点按指数退避(带随机抖动)暂停上报，
+    由后台探测恢复；上报时上次成功的端点优先，其次按延迟排序"""
+
+    def __init__(self, base: float = 5.0, limit: float = 600.0,
+                 jitter: float = 0.5, alpha: float = 0.3):
+        self.base = base  # 首次失败的退避时间(秒)
+        self.limit = limit  # 退避时间上限(秒)
+        self.jitter = jitter  # 抖动比例，实际退避为 [1-jitter, 1] 倍
+        self.alpha = alpha  # 延迟平滑系数
+        self.points: dict = {}  # url -> VMEndpoint
+        self.lock = threading.Lock()
+
+    # 同步端点 ==============================================================
+    def sync(self, url_list: list):
+        """网卡变化后只保留当前候选端点，已有端点保留其健康记录"""
+        with self.lock:
+            self.points = {url: self.points.get(url) or VMEndpoint(url) for url in url_list}
+
+    # 选择端点 ==============================================================
+    def select(self, url_list: list) -> list:
+        """返回健康端点，上次成功的在前，其余按延迟排序；退避中的端点跳过"""
+        with self.lock:
+            points = [self.points.setdefault(url, VMEndpoint(url)) for url in url_list]
+        ready = [point for point in points if point.failures == 0]
+        ready.sort(key=lambda point: (-(point.last_ok or 0.0),
+                                      point.latency if point.latency is not None else float("inf")))
+        if len(ready) < len(points):
+            logger.debug("[控制器端点] {} 个端点退避中", len(points) - len(ready))
+        return [point.url for point in ready]
+
+    def due(self) -> list:
+        """退避到期、需要探测的端点"""
+        now = time.monotonic()
+        with self.lock:
+            return [url for url, point in self.points.items()
+                    if point.failures and now >= point.retry_at]
+
+    # 记录结果 ==============================================================
+    def success(self, url: str, elapsed: float):
+        with self.lock:
+            point = self.points.get(url)
+            if point is None:
+                return
+            if point.failures:
+                logger.info("[控制器端点] 已恢复: {}", url)
+            point.failures = 0
+            point.last_ok = time.time()
+            point.latency = elapsed if point.latency is None else \
+                point.latency + self.alpha * (elapsed - point.latency)
+
+    def failure(self, url: str):
+        with self.lock:
+            point = self.points.get(url)
+            if point is None:
+                return
+            point.failures += 1
+            delay = min(self.limit, self.base * 2 ** min(point.failures - 1, 32))
+            delay *= 1.0 - self.jitter * random.random()
+            point.retry_at = time.monotonic() + delay
+            logger.warning("[控制器端点] 第 {} 次失败，{:.0f}s 后探测: {}", point.failures, delay, url)
+
+    # 后台探测 ==============================================================
+    def probe(self, client, deadline: float = 3.0) -> list:
+        """对退避到期的端点发送轻量请求，收到任何非5xx响应即视为恢复"""
+        recovered = []
+        tracer.count("probe")
+        for url, result in client.fan_out("GET", self.due(), deadline=deadline):
+            if isinstance(result, Exception) or result.status_code >= 500:
+                self.failure(url)
+                continue
+            self.success(url, result.elapsed.total_seconds())
+            recovered.append(url)
+        return recovered
+
+    # 状态快照 ==============================================================
+    def stats(self) -> dict:
+        with self.lock:
+            return {url: point.to_dict() for url, point in self.points.items()}
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+from .VMTracer import tracer
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):  # Windows 没有 Unix 套接字
+    class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+        """Unix 套接字上的 HTTP 服务"""
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            return request, ("unix", 0)
+
+
+class VMMetric:
+    """本机指标接口：通过回环 HTTP 及 Unix 套接字提供最近一次快照及滚动统计，
+    JSON 及 Prometheus 文本两种格式，只读取内存缓存，不会触发采集"""
+    PREFIX = "openidcs_"
+    HIDDEN = ("vm_pass",)  # 不对外暴露的字段
+    WINDOW_STATS = ("min", "avg", "max", "p95")
+    # 字典字段: 字段 -> (标签名, 数组各列对应的指标名)
+    SERIES = {
+        "cpu_cores": ("core", ("cpu_core_usage",)),
+        "cpu_modes": ("mode", ("cpu_mode_usage",)),
+        "ext_usage": ("mount", ("ext_total_mb", "ext_used_mb")),
+        "nic_usage": ("nic", ("nic_up_mbps", "nic_down_mbps")),
+        "gpu_stats": ("gpu", ("gpu_load", "gpu_mem_used_mb", "gpu_heats")),
+    }
+
+    def __init__(self, address: tuple = ("127.0.0.1", 9180), socket_path: str = None, window=None):
+        self.address = address  # 回环监听地址，None 为不启用
+        self.socket_path = socket_path  # Unix 套接字路径，None 为不启用
+        self.window = window  # 滚动统计: () -> {名称: [最小, 平均, 最大, P95]}，只读缓存
+        self.status: dict = {}  # 最近一次快照
+        self.updated = 0.0  # 快照时间(Unix时间戳)
+        self.servers: list = []
+
+    # 更新缓存 ==============================================================
+    def update(self, vm_status: dict):
+        """由采集任务在每轮结束时调用，整体替换引用，读取方无需加锁"""
+        self.status = {key: value for key, value in vm_status.items() if key not in self.HIDDEN}
+        self.updated = time.time()
+
+    # JSON ==================================================================
+    def to_json(self) -> bytes:
+        return json.dumps({"time": self.updated, "status": self.status,
+                           "window": self.window() if self.window else {}}).encode("utf-8")
+
+    # Prometheus ============================================================
+    @staticmethod
+    def label(value) -> str:
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def to_prometheus(self) -> bytes:
+        status, lines = self.status, []
+        lines.append(f"{self.PREFIX}snapshot_time {self.updated}")
+        for key, value in status.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f"{self.PREFIX}{key} {value}")
+        if "ac_status" in status:
+            lines.append(f'{self.PREFIX}power_status{{state="{self.label(status["ac_status"])}"}} 1')
+        for key, (label, names) in self.SERIES.items():
+            for item, values in (status.get(key) or {}).items():
+                values = values if isinstance(values, (list, tuple)) else [values]
+                for name, value in zip(names, values):
+                    lines.append(f'{self.PREFIX}{name}{{{label}="{self.label(item)}"}} {value}')
+        for key, values in (self.window() if self.window else {}).items():
+            for stat, value in zip(self.WINDOW_STATS, values):
+                lines.append(f'{self.PREFIX}window_{key}{{stat="{stat}"}} {value}')
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    # 请求处理 ==============================================================
+    def handler(self):
+        metric = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/", "/status", "/status.json"):
+                    body, kind = metric.to_json(), "application/json"
+                elif path == "/stats":
+                    body, kind = json.dumps(tracer.stats()).encode("utf-8"), "application/json"
+                elif path == "/metrics":
+                    body, kind = metric.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("[本机指标] {}", format % args)
+
+        return Handler
+
+    # 启动服务 ==============================================================
+    def start(self):
+        if self.address:
+            try:
+                self.serve(ThreadingHTTPServer(self.address, self.handler()))
+                logger.info("[本机指标] 监听 http://{}:{}", *self.address)
+            except OSError as e:
+                logger.warning("[本机指标] 无法监听 {}: {}", self.address, e)
+        if self.socket_path and hasattr(socketserver, "ThreadingUnixStreamServer"):
+            try:
+                os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)
+                server = UnixHTTPServer(self.socket_path, self.handler())
+                os.chmod(self.socket_path, 0o660)
+                self.serve(server)
+                logger.info("[本机指标] 监听 unix:{}", self.socket_path)
+            except OSError as e:
+                logger.warning("[本机指标] 无法监听 {}: {}", self.socket_path, e)
+
+    def serve(self, server):
+        self.servers.append(server)
+        threading.Thread(target=server.serve_forever, name="vm-metric", daemon=True).start()
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+
+if __name__ == "__main__":
+    # 自检: python -m VMUploader.VMMetric
+    metric = VMMetric(address=None, window=lambda: {"cpu_usage": [1, 2, 3, 3]})
+    metric.update({"cpu_usage": 12, "ac_status": "STARTED", "vm_pass": "secret",
+                   "nic_usage": {"eth0": [1.5, 2.5]}, "cpu_model": "x", "cpu_cores": {"0": 7.5}})
+    text = metric.to_prometheus().decode()
+    assert "secret" not in text and 'openidcs_nic_up_mbps{nic="eth0"} 1.5' in text, text
+    assert 'openidcs_cpu_core_usage{core="0"} 7.5' in text, text
+    print(text)
@@ -0,0 +1,87 @@
+import time
+import random
+from loguru import logger
+from .VMReport import VMReport
+from .VMTracer import tracer
+
+
+class VMNotify:
+    """配置推送通道：向当前最优控制器发起长轮询，配置变化时立即交给 deliver；
+    控制器不支持或不可达时退避，周期上报仍作为兜底"""
+    UPLOAD_PATH = "/api/client/upload"
+    NOTIFY_PATH = "/api/client/notify"
+
+    def __init__(self, report: VMReport, hold: float = 55.0,
+                 retry: float = 5.0, retry_limit: float = 60.0, unsupported: float = 600.0,
+                 min_gap: float = 5.0):
+        self.report = report  # 共用上报地址、端点健康状态及长连接客户端
+        self.hold = hold  # 控制器最长挂起时间(秒)，读取超时在此基础上放宽
+        self.retry = retry  # 失败后首次重试间隔(秒)
+        self.retry_limit = retry_limit  # 重试间隔上限(秒)
+        self.unsupported = unsupported  # 控制器不支持推送时的暂停时间(秒)
+        self.min_gap = min_gap  # 两次长轮询发起的最小间隔(秒)，控制器未挂起请求时避免空转
+        self.version = ""  # 上次收到的配置版本(ETag)
+        self.failures = 0  # 连续失败次数
+        self.running = True
+
+    # 推送地址 ==============================================================
+    def target(self) -> str:
+        """当前最优上报端点对应的推送地址，没有可用端点时返回空"""
+        url_list = self.report.health.select(self.report.url_list)
+        if not url_list:
+            return ""
+        return url_list[0].replace(self.UPLOAD_PATH, self.NOTIFY_PATH, 1) + f"&wait={int(self.hold)}"
+
+    # 单次长轮询 ============================================================
+    def poll(self, deliver) -> float:
+        """发起一次长轮询，返回下次发起前需要等待的秒数"""
+        url = self.target()
+        if not url:
+            return self.retry
+        client = self.report.client
+        headers = {"Accept": "application/json"}
+        if self.version:
+            headers["If-None-Match"] = self.version
+        started = time.monotonic()
+        try:
+            vm_result = client.get(url, headers=headers,
+                                   timeout=(client.conn_timeout, self.hold + client.read_timeout))
+        except Exception as e:
+            self.failures += 1
+            tracer.count("push.error")
+            delay = min(self.retry_limit, self.retry * 2 ** min(self.failures - 1, 16))
+            logger.debug("[配置推送] 长轮询失败，{:.0f}s 后重试: {}", delay, e)
+            return delay * (0.5 + random.random() / 2)
+        self.failures = 0
+        rearm = max(0.0, self.min_gap - (time.monotonic() - started))  # 提前返回时补足间隔
+        if vm_result.status_code in (404, 405, 501):
+            logger.info("[配置推送] 控制器不支持推送，{:.0f}s 内只使用周期上报", self.unsupported)
+            return self.unsupported
+        if vm_result.status_code in (204, 304):
+            return rearm  # 挂起超时，配置未变化
+        if vm_result.status_code != 200:
+            logger.warning("[配置推送] 长轮询返回 {}", vm_result.status_code)
+            return self.retry
+        vm_body = vm_result.json()
+        self.version = vm_result.headers.get("ETag") or str(vm_body.get("version", ""))
+        vm_data = vm_body.get("data")
+        if vm_data:
+            logger.info("[配置推送] 收到控制器推送的配置")
+            tracer.count("push.received")
+            deliver(vm_data)
+        return rearm
+
+    # 运行 ==================================================================
+    def run(self, deliver):
+        """在独立的守护线程中运行，退出时无需等待挂起的请求"""
+        while self.running:
+            try:
+                delay = self.poll(deliver)
+            except Exception as e:
+                logger.error("[配置推送] {}", e)
+                delay = self.retry
+            if delay > 0:
+                time.sleep(delay)
+
+    def stop(self):
+        self.running = False
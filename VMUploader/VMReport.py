@@ -0,0 +1,225 @@
+import json
+import requests
+from loguru import logger
+from .VMClient import VMClient
+from .VMCodecs import VMCodecs
+from .VMDeltas import VMDeltas
+from .VMHealth import VMHealth
+from .VMSpools import VMSpools
+from .VMTracer import tracer
+
+
+class VMReport:
+    """状态上报：推算控制器地址、按端点协商编码并并发上报"""
+
+    def __init__(self, client: VMClient, delta: VMDeltas = None,
+                 binary: bool = False, limit: float = 8.0, spool: VMSpools = None):
+        self.client = client  # 共用的长连接客户端
+        self.delta = delta  # 增量编码器，None 为全量JSON
+        self.binary = binary  # 是否允许协商二进制编码(默认关闭)
+        self.limit = limit  # 每轮上报的整体截止时间(秒)
+        self.codecs: dict = {}  # 端点 -> 已协商的 Content-Type
+        self.url_list: list = []  # 当前上报地址，网卡变化时由 retarget 更新
+        self.health = VMHealth()  # 端点健康状态及退避
+        self.spool = spool  # 未送达状态的本地缓存，None 为直接丢弃
+
+    # 上报地址 ==============================================================
+    @staticmethod
+    def targets(nets_list) -> list:
+        """根据网卡网关推算全部候选控制器上报地址"""
+        url_list = []
+        for nic_name in nets_list:
+            nic_gate = nets_list[nic_name].ip4_gate
+            if nic_gate == "" or not nic_gate.endswith(".1"):
+                continue
+            if nets_list[nic_name].mac_addr == "00:00:00:00:00:00":
+                continue
+            nic_gate = ".".join(nic_gate.split(".")[:-1]) + ".2"
+            url_post = f"http://{nic_gate}:1880/api/client/upload"
+            url_post += f"?nic={nets_list[nic_name].mac_addr}"
+            url_list.append(url_post)
+        return url_list
+
+    def retarget(self, nets_list) -> list:
+        """网卡或网关变化时重新推算上报地址，丢弃已失效端点的协商及增量状态"""
+        url_list = self.targets(nets_list)
+        for url in set(self.url_list) - set(url_list):
+            self.codecs.pop(url, None)
+            if self.delta is not None:
+                self.delta.reset(url)
+        if url_list != self.url_list:
+            logger.info("[上报地址变化] {}", url_list)
+        self.health.sync(url_list)
+        self.url_list = url_list
+        return url_list
+
+    # 选择编码 ==============================================================
+    def encode(self, url: str, vm_status: dict) -> dict:
+        """按端点已协商的格式生成请求参数，二进制只在比JSON(增量/压缩后)更小时使用"""
+        headers = {"Accept": "application/json", "X-Report-Id": vm_status.get("col_uuid") or ""}
+        if self.delta is not None:
+            params = self.delta.encode(url, vm_status)
+        else:
+            params = {"data": json.dumps(vm_status).encode("utf-8"),
+                      "headers": {"Content-Type": "application/json"}}
+        if self.codecs.get(url) == VMCodecs.CONTENT_TYPE:
+            packed = VMCodecs.dumps_status(vm_status)
+            if len(packed) < len(params["data"]):
+                if self.delta is not None:
+                    self.delta.reset(url)  # 二进制为全量报文，回退JSON时重新发送全量
+                params = {"data": packed, "headers": {"Content-Type": VMCodecs.CONTENT_TYPE}}
+        params["headers"].update(headers)
+        return params
+
+    # 协商编码 ==============================================================
+    def negotiate(self, url: str, vm_result):
+        """控制器通过 Accept-Post 声明可接收的格式，415 时回退JSON"""
+        if vm_result.status_code == 415:
+            self.codecs.pop(url, None)
+            return
+        accept = vm_result.headers.get("Accept-Post", "")
+        if self.binary and VMCodecs.CONTENT_TYPE in accept:
+            self.codecs[url] = VMCodecs.CONTENT_TYPE
+        elif accept:
+            self.codecs.pop(url, None)
+
+    # 记录结果 ==============================================================
+    def record(self, url: str, vm_result) -> bool:
+        """记录端点健康状态、延迟直方图及失败/超时计数，返回是否收到响应"""
+        if isinstance(vm_result, Exception):
+            timeout = isinstance(vm_result, requests.exceptions.Timeout)
+            tracer.count("post.timeout" if timeout else "post.error")
+            self.health.failure(url)
+            return False
+        elapsed = vm_result.elapsed.total_seconds()
+        tracer.observe("post:" + VMClient.endpoint(url), elapsed)
+        if vm_result.status_code >= 500:
+            tracer.count("post.error")
+            self.health.failure(url)
+        else:
+            self.health.success(url, elapsed)
+        return True
+
+    # 并发上报 ==============================================================
+    def upload(self, vm_status: dict, url_list: list, deliver=None):
+        """并发上报到健康的控制器，最先返回的配置立即交给 deliver 并作为结果返回；
+        全部未接收时写入本地缓存，送达后补报缓存中的旧状态"""
+        with tracer.span("upload"):
+            return self.__upload__(vm_status, url_list, deliver)
+
+    def __upload__(self, vm_status: dict, url_list: list, deliver=None):
+        vm_apply, accepted = None, False
+        if not url_list:
+            logger.warning("[上报虚拟机状态] 没有符合条件的网关，不上报也不缓存")
+            return None
+        url_list = self.health.select(url_list)
+        if not url_list:
+            logger.warning("[上报虚拟机状态] 控制器端点均在退避中，等待后台探测恢复")
+            if self.spool is not None:
+                self.spool.push(vm_status)
+            return None
+        for url_post, vm_result in self.client.fan_out(
+                "POST", url_list, deadline=self.limit,
+                build=lambda url: self.encode(url, vm_status)):
+            logger.info("[上报虚拟机状态地址] {}", url_post)
+            if not self.record(url_post, vm_result):
+                logger.error("[上报虚拟机状态异常] {}", vm_result)
+                continue
+            try:  # 处理上报结果 ==============================================
+                logger.info("[上报虚拟机状态结果] {}", vm_result.status_code)
+                self.negotiate(url_post, vm_result)
+                if vm_result.status_code == 409 and self.delta is not None:
+                    self.delta.reset(url_post)  # 控制器要求重新同步
+                    continue
+                if vm_result.status_code != 200:
+                    continue
+                logger.info("[上报虚拟机状态成功]")
+                accepted = True
+                vm_body = vm_result.json()
+                if self.delta is not None:
+                    if vm_body.get("resync"):
+                        self.delta.reset(url_post)
+                    else:
+                        self.delta.commit(url_post)
+                vm_data = vm_body['data']
+                if vm_data and vm_apply is None:
+                    vm_apply = vm_data
+                    if deliver is not None:
+                        deliver(vm_data)
+            except Exception as e:
+                logger.error("[上报虚拟机状态异常] {}", e)
+        if self.spool is not None:
+            if not accepted:
+                self.spool.push(vm_status)
+            else:
+                self.drain(url_list)
+        return vm_apply
+
+    # 批量上报 ==============================================================
+    def upload_batch(self, batch: list, url_list: list, deliver=None):
+        """多份采样 [(生成时间, 状态字典)] 合并为一次请求，控制器返回的配置每批只处理一次；
+        批量报文为全量JSON，不参与增量及二进制编码"""
+        vm_apply, accepted = None, False
+        if not url_list:
+            logger.warning("[批量上报状态] 没有符合条件的网关，不上报也不缓存")
+            return None
+        url_list = self.health.select(url_list)
+        body = json.dumps({"items": [{"time": created, "data": vm_status}
+                                     for created, vm_status in batch]},
+                          separators=(",", ":")).encode("utf-8")
+        headers = {"Accept": "application/json", "Content-Type": "application/json",
+                   "X-Report-Batch": str(len(batch))}
+        if self.delta is not None:
+            body, encoding = self.delta.deflate(body)
+            if encoding:
+                headers["Content-Encoding"] = encoding
+        for url_post, vm_result in self.client.fan_out(
+                "POST", url_list, deadline=self.limit, data=body, headers=headers):
+            logger.info("[批量上报状态地址] {} 共 {} 份", url_post, len(batch))
+            if not self.record(url_post, vm_result) or vm_result.status_code >= 500:
+                logger.error("[批量上报状态异常] {}", vm_result)
+                continue
+            if vm_result.status_code != 200:
+                logger.info("[批量上报状态结果] {}", vm_result.status_code)
+                continue
+            accepted = True
+            try:
+                vm_data = vm_result.json()['data']
+            except Exception as e:
+                logger.error("[批量上报状态异常] {}", e)
+                continue
+            if vm_data and vm_apply is None:
+                vm_apply = vm_data
+                if deliver is not None:
+                    deliver(vm_data)
+        if self.spool is not None:
+            if not accepted:
+                for created, vm_status in batch:
+                    self.spool.push(vm_status, created)
+            else:
+                self.drain(url_list)
+        return vm_apply
+
+    # 补报缓存 ==============================================================
+    def drain(self, url_list: list) -> int:
+        """按时间先后补报一批缓存状态(全量JSON，附原始生成时间)，遇到未送达即停止；
+        补报的是历史状态，控制器返回的配置不再应用"""
+        sent = []
+        for row_id, created, vm_status in self.spool.peek():
+            headers = {"Accept": "application/json", "X-Report-Time": f"{created:.3f}",
+                       "X-Report-Id": vm_status.get("col_uuid") or ""}
+            if not any(not isinstance(vm_result, Exception) and vm_result.status_code == 200
+                       for _, vm_result in self.client.fan_out(
+                           "POST", url_list, deadline=self.limit, json=vm_status, headers=headers)):
+                break
+            sent.append(row_id)
+        self.spool.remove(sent)
+        tracer.count("spool.replayed", len(sent))
+        if sent:
+            logger.info("[补报缓存状态] 已补报 {} 条，剩余 {} 条", len(sent), len(self.spool))
+        return len(sent)
+
+    # 探测端点 ==============================================================
+    def probe(self) -> list:
+        """由后台任务周期调用，恢复退避到期的端点"""
+        return self.health.probe(self.client)
@@ -0,0 +1,104 @@
+import json
+from loguru import logger
+from .VMPowers import VMPowers
+
+
+class VMField:
+    """字段声明：名称、类型、默认值、说明"""
+    __slots__ = ("name", "kind", "default", "note")
+
+    def __init__(self, name: str, kind: str, default=None, note: str = ""):
+        self.name = name
+        self.kind = kind  # int / float / str / dict / list / power
+        self.default = default
+        self.note = note
+
+
+def text(value) -> str:
+    """文本字段只接受标量，None 及字典/列表等不转换为字符串"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError(f"需要文本，实际为 {type(value).__name__}")
+
+
+def power(value) -> VMPowers:
+    """电源状态按枚举名称还原，未知名称视为取值错误"""
+    if isinstance(value, VMPowers):
+        return value
+    try:
+        return VMPowers.from_json(value)
+    except KeyError:
+        raise ValueError(f"未知的电源状态: {value!r}") from None
+
+
+class VMSchema(type):
+    """由 FIELDS 字段表生成 __slots__ 及 to_dict/from_dict/update 等函数"""
+    # 类型校验(来自控制器等外部数据时使用) ==================================
+    CHECKS = {
+        "int": int,
+        "float": float,
+        "str": text,
+        "dict": dict,
+        "list": list,
+        "power": power,
+    }
+
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get("FIELDS", ())
+        namespace["__slots__"] = tuple(field.name for field in fields)
+        cls = super().__new__(mcs, name, bases, namespace)
+        if fields:
+            mcs.__build__(cls, fields, "__init__" in namespace)
+        return cls
+
+    # 生成函数 ==============================================================
+    @classmethod
+    def __build__(mcs, cls, fields, has_init: bool):
+        scope = {"VMPowers": VMPowers}
+        for field in fields:
+            scope[f"_d_{field.name}"] = field.default
+        # 初始化: 可变默认值每个实例单独复制 ================================
+        init = ["def __fill__(self, config=None, /, **kwargs):"]
+        for field in fields:
+            if field.kind == "dict":
+                init.append(f"    self.{field.name} = {{}}")
+            elif field.kind == "list":
+                init.append(f"    self.{field.name} = []")
+            else:
+                init.append(f"    self.{field.name} = _d_{field.name}")
+        init += ["    if config is not None:", "        self.update(config)",
+                 "    if kwargs:", "        self.update(kwargs)"]
+        # 序列化: 一次性构造字典字面量 ======================================
+        dump = ["def to_dict(self):", "    return {"]
+        for field in fields:
+            value = f"self.{field.name}"
+            if field.kind == "power":
+                value = f"{value}.name if isinstance({value}, VMPowers) else {value}"
+            dump.append(f"        {field.name!r}: {value},")
+        dump.append("    }")
+        # 更新: 只接受已声明字段并校验类型，类型不符的字段跳过并记录 ======
+        load = ["def update(self, data):",
+                "    for key, value in data.items():",
+                "        check = _CHECKS.get(key)",
+                "        if check is None:",
+                "            continue",
+                "        try:",
+                "            setattr(self, key, check(value))",
+                "        except (TypeError, ValueError) as e:",
+                f"            _logger.warning('[{cls.__name__}] 忽略字段 {{}}={{!r}}: {{}}', key, value, e)",
+                "    return self"]
+        scope["_logger"] = logger
+        scope["_CHECKS"] = {field.name: mcs.CHECKS[field.kind] for field in fields}
+        exec("\n".join(init + dump + load), scope)
+        cls.__fill__ = scope["__fill__"]
+        if not has_init:
+            cls.__init__ = scope["__fill__"]
+        cls.to_dict = scope["to_dict"]
+        cls.update = scope["update"]
+        cls.from_dict = classmethod(lambda klass, data: klass(data))
+        cls.__str__ = lambda self: json.dumps(self.to_dict())
+        cls.__repr__ = lambda self: f"{type(self).__name__}({self.to_dict()!r})"
+        cls.__eq__ = lambda self, other: type(self) is type(other) and self.to_dict() == other.to_dict()
+        cls.__hash__ = None
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import sqlite3
+import platform
+import threading
+from loguru import logger
+from .VMTracer import tracer
+
+
+class VMSpools:
+    """本地上报缓存(SQLite)：全部控制器都未接收的状态写入磁盘，
+    恢复连接后按时间先后分批补报，按总大小及保存时间限制容量，重启后仍可补报"""
+
+    def __init__(self, path: str = None, max_size: int = 64 * 1024 * 1024,
+                 max_age: float = 7 * 86400.0, batch: int = 20):
+        self.path = path or self.default_path()
+        self.max_size = max_size  # 缓存数据总大小上限(字节)，超出时丢弃最旧的
+        self.max_age = max_age  # 最长保存时间(秒)，过期的丢弃
+        self.batch = batch  # 每次补报的条数
+        self.lock = threading.Lock()
+        self.conn = self.__open__()
+
+    # 默认路径 ==============================================================
+    @staticmethod
+    def default_path() -> str:
+        if platform.system().lower() == "windows":
+            base = os.path.join(os.environ.get("ProgramData", "C:\\ProgramData"), "OpenIDCS")
+        else:
+            base = "/var/lib/openidcs"
+        return os.path.join(base, "spool.db")
+
+    # 打开数据库 ============================================================
+    def __open__(self) -> sqlite3.Connection:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("[上报缓存] 无法打开 {}，改为仅内存缓存: {}", self.path, e)
+            self.path = ":memory:"
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")  # 每次提交落盘，断电不丢失已缓存状态
+        conn.execute("CREATE TABLE IF NOT EXISTS spool ("
+                     "id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, body TEXT NOT NULL)")
+        return conn
+
+    # 写入 ==================================================================
+    def push(self, vm_status: dict, created: float = None):
+        with self.lock:
+            self.conn.execute("INSERT INTO spool (created, body) VALUES (?, ?)",
+                              (created or time.time(), json.dumps(vm_status)))
+            self.trim()
+        tracer.count("spool.pushed")
+        logger.info("[上报缓存] 已缓存未送达状态，共 {} 条", len(self))
+
+    # 容量限制 ==============================================================
+    def trim(self):
+        """丢弃过期的及超出总大小的最旧记录(调用方持有锁)"""
+        expired = self.conn.execute("DELETE FROM spool WHERE created < ?",
+                                    (time.time() - self.max_age,)).rowcount
+        total, dropped = 0, 0
+        for row_id, size in self.conn.execute("SELECT id, length(body) FROM spool ORDER BY id DESC"):
+            total += size
+            if total > self.max_size:
+                dropped = self.conn.execute("DELETE FROM spool WHERE id <= ?", (row_id,)).rowcount
+                break
+        if expired or dropped:
+            logger.warning("[上报缓存] 丢弃 {} 条过期、{} 条超出容量的记录", expired, dropped)
+
+    # 读取 ==================================================================
+    def peek(self, limit: int = None) -> list:
+        """最旧的 limit 条: [(id, 生成时间, 状态字典)]"""
+        with self.lock:
+            rows = self.conn.execute("SELECT id, created, body FROM spool ORDER BY id LIMIT ?",
+                                     (limit or self.batch,)).fetchall()
+        return [(row_id, created, json.loads(body)) for row_id, created, body in rows]
+
+    def remove(self, ids: list):
+        if not ids:
+            return
+        with self.lock:
+            self.conn.executemany("DELETE FROM spool WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # 自检: python -m VMUploader.VMSpools
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "spool.db")
+    spool = VMSpools(path, max_size=200, max_age=60)
+    spool.push({"flu_usage": 1}, created=time.time() - 120)  # 已过期
+    for index in range(10):
+        spool.push({"flu_usage": index, "pad": "x" * 20})
+    rows = spool.peek(3)
+    assert [row[2]["flu_usage"] for row in rows] == [6, 7, 8], rows  # 只保留容量内最新的
+    spool.remove([row[0] for row in rows])
+    spool.close()
+    assert len(VMSpools(path)) == 1  # 重新打开后仍在
+    print("VMSpools OK")
@@ -1,75 +1,185 @@
 import json
+import uuid
 import psutil
-import GPUtil
+import platform
+from .CPUStats import CPUStats
+from .GPUStats import GPUStats
+from .HDDMount import HDDMount
 from .HWStatus import HWStatus
+from .NETStats import NETStats
+from .ProcRead import ProcRead
+from .RingBuff import RingBuff
+from .VMCollect import VMRegistry
 from .VMPowers import VMPowers
+from .VMTracer import tracer
+
+try:
+    import cpuinfo
+except ImportError:  # py-cpuinfo 缺失时退回 platform.processor()
+    cpuinfo = None
 
 
 class VMStatus:
-    def __init__(self):
+    RING_KEYS = ("cpu_usage", "mem_usage", "network_u", "network_d")
+
+    def __init__(self, ring_size: int = 60, backend: str = "auto", root: str = "/proc"):
         self.vm_status = HWStatus()
+        # 采集后端: proc 直读 /proc，psutil 为跨平台兜底，auto 自动选择 ====
+        # root 可指向录制的 /proc 目录，用于离线回放 ========================
+        self.backend = self.select(backend, root)
+        self.reader = ProcRead(root) if self.backend == "proc" else None
+        self.cpu_stats = CPUStats(self.reader)
+        self.net_stats = NETStats(reader=self.reader)
+        self.hdd_mount = HDDMount()
+        self.gpu_stats = GPUStats()
+        # 高频采样(独立基线及读取器，不影响上报窗口的统计) ==================
+        self.ring_reader = ProcRead(root) if self.backend == "proc" else None
+        self.ring_cpu = CPUStats(self.ring_reader)
+        self.ring_net = NETStats(reader=self.ring_reader)
+        self.ring_data = {key: RingBuff(ring_size) for key in self.RING_KEYS}
+        # 采集项注册表 ======================================================
+        self.registry = VMRegistry()
+        self.__register__()
+
+    # 选择采集后端 ========================================================
+    @staticmethod
+    def select(backend: str, root: str = "/proc") -> str:
+        if backend not in ("auto", "proc", "psutil"):
+            raise ValueError(f"未知的采集后端: {backend}")
+        if backend == "auto":
+            return "proc" if ProcRead.available(root) else "psutil"
+        return backend
 
     # 转换为字典 ============================================================
     def __dict__(self):
-        return self.vm_status.__dict__()
+        return self.vm_status.to_dict()
 
     # 转换为文本 ============================================================
     def __str__(self):
         return json.dumps(self.__dict__())
 
+    # 高频采样 ==============================================================
+    def sample(self):
+        """按固定频率调用，写入CPU/内存/网卡速率样本"""
+        self.ring_data["cpu_usage"].push(self.ring_cpu.sample())
+        if self.ring_reader is not None:
+            self.ring_data["mem_usage"].push(self.ring_reader.mem_usage()[1] / (1024 * 1024))
+        else:
+            self.ring_data["mem_usage"].push(psutil.virtual_memory().used / (1024 * 1024))
+        self.ring_net.sample()
+        self.ring_data["network_u"].push(self.ring_net.network_u)
+        self.ring_data["network_d"].push(self.ring_net.network_d)
+
+    def window(self) -> dict:
+        """当前窗口内 [最小, 平均, 最大, P95]，只读取，不清空"""
+        return {key: ring.stats() for key, ring in self.ring_data.items()}
+
+    # 采集项 ==============================================================
+    @staticmethod
+    def get_cpu_model() -> str:
+        if cpuinfo is not None:
+            info = cpuinfo.get_cpu_info()
+            return info.get("brand_raw") or info.get("brand", "")
+        return platform.processor()
+
+    def get_mem_usage(self) -> list:
+        if self.reader is not None:
+            total, used = self.reader.mem_usage()
+        else:
+            mem = psutil.virtual_memory()
+            total, used = mem.total, mem.used
+        return [int(total / (1024 * 1024)), int(used / (1024 * 1024))]  # 转换为MB
+
+    @staticmethod
+    def get_hdd_usage() -> list:
+        disk_usage = psutil.disk_usage('/')
+        return [int(disk_usage.total / (1024 * 1024)), int(disk_usage.used / (1024 * 1024))]
+
+    def get_ext_usage(self) -> tuple:
+        return self.hdd_mount.usage(), self.hdd_mount.stale
+
+    def get_network(self) -> dict:
+        flu_usage = self.net_stats.sample()  # 本窗口流量(MB)
+        return {"flu_usage": flu_usage,
+                "network_u": self.net_stats.network_u,  # 上行(Mbps)
+                "network_d": self.net_stats.network_d,  # 下行(Mbps)
+                "nic_usage": self.net_stats.nics,
+                "busiest": self.net_stats.busiest}
+
+    @staticmethod
+    def merge_network(older: dict, newer: dict) -> dict:
+        """迟到的流量计入下一轮，带宽取较新的值"""
+        return dict(newer, flu_usage=older["flu_usage"] + newer["flu_usage"])
+
+    @staticmethod
+    def get_nic_speed() -> dict:
+        return {name: stats.speed for name, stats in psutil.net_if_stats().items()}
+
+    # 注册采集项 ============================================================
+    def __register__(self):
+        """静态信息只在启动及热插拔时采集，易变信息每轮采集"""
+        register = self.registry.register
+        register("cpu_model", self.get_cpu_model, interval=None, budget=5.0, default="")
+        register("cpu_total", lambda: psutil.cpu_count(logical=True), interval=None, default=0)
+        register("gpu_list", self.gpu_stats.rescan, interval=None, budget=5.0, default=[])
+        register("nic_speed", self.get_nic_speed, interval=300.0, default={})
+        register("cpu_usage", self.cpu_stats.sample, default=0.0)
+        register("mem_usage", self.get_mem_usage, default=[0, 0])
+        register("hdd_usage", self.get_hdd_usage, default=[0, 0])
+        register("ext_usage", self.get_ext_usage, budget=3.0, default=({}, []))
+        register("gpu_stats", self.gpu_stats.sample, budget=2.0, default={})
+        register("network", self.get_network, merge=self.merge_network, default={
+            "flu_usage": 0, "network_u": 0, "network_d": 0, "nic_usage": {}, "busiest": ""})
+
+    # 热插拔 ================================================================
+    def hotplug(self):
+        """CPU/内存/GPU 等硬件变化时调用，下一轮重新采集静态信息"""
+        self.registry.invalidate()
+
     # 获取状态 ==============================================================
+    @tracer.timed("status")
     def status(self) -> HWStatus:
+        values = self.registry.collect()
         self.vm_status.ac_status = VMPowers.STARTED
         # 获取CPU信息 =======================================================
-        self.vm_status.cpu_total = psutil.cpu_count(logical=True)
-        self.vm_status.cpu_usage = int(psutil.cpu_percent(interval=1))
+        self.vm_status.cpu_model = values["cpu_model"]
+        self.vm_status.cpu_total = values["cpu_total"]
+        self.vm_status.cpu_usage = int(values["cpu_usage"])  # 上报窗口内平均使用率
+        self.vm_status.cpu_cores = {str(index): round(usage, 1)
+                                    for index, usage in enumerate(self.cpu_stats.cores)}
+        self.vm_status.cpu_modes = {mode: round(usage, 1) for mode, usage in self.cpu_stats.modes.items()}
+        if self.cpu_stats.cores and len(self.cpu_stats.cores) != values["cpu_total"]:
+            self.hotplug()  # 核心数变化，下一轮重新读取静态信息
         # 获取内存信息 ======================================================
-        mem = psutil.virtual_memory()
-        self.vm_status.mem_total = int(mem.total / (1024 * 1024))  # 转换为MB
-        self.vm_status.mem_usage = int(mem.used / (1024 * 1024))  # 内存已用量
+        self.vm_status.mem_total, self.vm_status.mem_usage = values["mem_usage"]
         # 获取系统磁盘信息 ==================================================
-        disk_usage = psutil.disk_usage('/')
-        self.vm_status.hdd_total = int(disk_usage.total / (1024 * 1024))
-        self.vm_status.hdd_usage = int(disk_usage.used / (1024 * 1024))
+        self.vm_status.hdd_total, self.vm_status.hdd_usage = values["hdd_usage"]
         # 获取其他磁盘信息 ==================================================
-        for disk in psutil.disk_partitions():
-            if disk.mountpoint != '/':
-                usage = psutil.disk_usage(disk.mountpoint)
-                self.vm_status.ext_usage[disk.mountpoint] = [
-                    int(usage.total / (1024 * 1024)),  # 总空间MB
-                    int(usage.used / (1024 * 1024))  # 已用空间MB
-                ]
+        self.vm_status.ext_usage, self.vm_status.ext_stale = values["ext_usage"]
         # 获取GPU信息 =======================================================
-        gpus = GPUtil.getGPUs()
-        self.vm_status.gpu_total = len(gpus)
-        for gpu in gpus:
-            self.vm_status.gpu_usage[gpu.id] = int(gpu.load * 100)  # 使用率
+        gpu_stats = values["gpu_stats"]
+        self.vm_status.gpu_total = len(values["gpu_list"])
+        self.vm_status.gpu_usage = {gpu_id: value[0] for gpu_id, value in gpu_stats.items()}
+        self.vm_status.gpu_stats = gpu_stats
         # 获取网络带宽 ======================================================
-        nic_list = psutil.net_io_counters(True)
-        max_name = ""
-        total_tx = total_rx = 0
-        for nic_name in nic_list:
-            print("网卡 {} 信息: ".format(nic_name))
-            nic_data = nic_list[nic_name]
-            print("网卡发送流量(MByte): ", nic_data.bytes_sent / (1024 * 1024))
-            print("网卡接收流量(MByte): ", nic_data.bytes_recv / (1024 * 1024))
-            if nic_data.bytes_sent / (1024 * 1024) > total_tx:
-                total_rx = nic_data.bytes_sent / (1024 * 1024)
-                total_tx = nic_data.bytes_recv / (1024 * 1024)
-            max_name = nic_name
-        self.vm_status.flu_usage = int(total_tx + total_rx)
-        self.vm_status.network_u = int(total_tx / 60 * 8)
-        self.vm_status.network_d = int(total_rx / 60 * 8)
-        print("当前双向流量(MByte): ", self.vm_status.flu_usage)
-        print("当前上行带宽(MByte): ", self.vm_status.network_u)
-        print("当前下行带宽(MByte): ", self.vm_status.network_d)
-        psutil.net_io_counters.cache_clear()
+        network = values["network"]
+        self.vm_status.flu_usage = network["flu_usage"]
+        self.vm_status.network_u = network["network_u"]
+        self.vm_status.network_d = network["network_d"]
+        self.vm_status.nic_usage = network["nic_usage"]
+        # 窗口统计 [最小, 平均, 最大, P95] ==================================
+        self.vm_status.win_stats = {key: ring.stats(reset=True)
+                                    for key, ring in self.ring_data.items()}
         # 物理网卡 ===========================================================
-        nic_list = psutil.net_if_stats()
-        if max_name in nic_list:
-            self.vm_status.network_a = nic_list[max_name].speed
+        self.vm_status.network_a = values["nic_speed"].get(network["busiest"], 0)
+        # 采集耗时及过期项 ==================================================
+        self.vm_status.col_delay = int(self.registry.latency * 1000)
+        self.vm_status.col_uuid = uuid.uuid4().hex
+        self.vm_status.col_stale = self.registry.stale()
+        return self.vm_status
 
 
 if __name__ == "__main__":
     hs = VMStatus()
+    print("采集后端:", hs.backend)
     # hs.server()
@@ -0,0 +1,112 @@
+import time
+import bisect
+import threading
+import functools
+from contextlib import contextmanager
+from loguru import logger
+
+
+class VMSeries:
+    """单个计时项：次数、总耗时、最大/最近耗时及固定分桶直方图(毫秒)"""
+    BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)  # 最后一个为 +Inf
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total += ms
+        self.last = ms
+        self.max = max(self.max, ms)
+        self.buckets[bisect.bisect_left(self.BUCKETS, ms)] += 1
+
+    def quantile(self, rate: float) -> float:
+        """按分桶估算分位数，返回所在桶的上界"""
+        rank, seen = rate * self.count, 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if hits and seen >= rank:
+                return float(self.BUCKETS[index]) if index < len(self.BUCKETS) else self.max
+        return 0.0
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total_ms": round(self.total, 3),
+                "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max, 3), "last_ms": round(self.last, 3),
+                "p95_ms": self.quantile(0.95),
+                "buckets": dict(zip([str(le) for le in self.BUCKETS] + ["+Inf"], self.buckets))}
+
+
+class VMTracer:
+    """代理自身的耗时统计：各阶段计时、各端点延迟直方图及失败/超时/跳过计数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series: dict = {}  # 名称 -> VMSeries
+        self.counters: dict = {}  # 名称 -> 次数
+        self.started = time.time()
+
+    # 记录 ==================================================================
+    def observe(self, name: str, seconds: float):
+        with self.lock:
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = VMSeries()
+            series.add(seconds * 1000)
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str):
+        """计时代码块，异常同样计时并计数 <名称>.error"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(name + ".error")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name: str):
+        """计时装饰器"""
+        def wrapper(func):
+            @functools.wraps(func)
+            def inner(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return inner
+        return wrapper
+
+    # 导出 ==================================================================
+    def stats(self) -> dict:
+        """完整统计，供本机指标接口及日志输出"""
+        with self.lock:
+            return {"uptime": round(time.time() - self.started, 1),
+                    "spans": {name: series.to_dict() for name, series in sorted(self.series.items())},
+                    "counters": dict(sorted(self.counters.items()))}
+
+    def summary(self) -> dict:
+        """精简统计 {名称: [次数, 平均ms, 最大ms]} 及 {计数名: 次数}，可随上报发送"""
+        with self.lock:
+            result = {name: [series.count, round(series.total / series.count, 2), round(series.max, 2)]
+                      for name, series in self.series.items() if series.count}
+            result.update(self.counters)
+        return result
+
+    def dump(self):
+        stats = self.stats()
+        for name, series in stats["spans"].items():
+            logger.info("[耗时统计] {} 次数={} 平均={}ms 最大={}ms P95<={}ms", name, series["count"],
+                        series["avg_ms"], series["max_ms"], series["p95_ms"])
+        for name, amount in stats["counters"].items():
+            logger.info("[计数统计] {} = {}", name, amount)
+
+
+tracer = VMTracer()  # 进程内共用的统计实例